@@ -1,23 +1,31 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-# ✅ STEP 2: load environment variables
-from pathlib import Path
-from dotenv import load_dotenv
-load_dotenv(Path(__file__).with_name(".env"), override=False)
+# ✅ STEP 2: load environment variables (config owns the single load_dotenv)
+import config  # noqa: F401
 
+import asyncio
+import hashlib
+import logging
 import os
-import threading
-import time
+import random
+import re
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+import orjson
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from config import ANALYZE_MAX_CONCURRENCY
+from data._http import close_client as close_http_client
 from services.analysis_service import analyze_ticker
 from services.watchlist_service import (
     add_to_watchlist,
     remove_from_watchlist,
     get_watchlist_with_analysis,
+    stream_watchlist_analyses,
     ProRequiredError,
 )
 
@@ -30,7 +38,7 @@ from logic.validation import validate_ticker
 # ✅ Alerts wiring
 from services.alert_store import init_db, upsert_rule, get_rules, get_rules_for_email, delete_rule
 from services.alerts_service import run_alerts_once
-from services.alert_delivery import send_email
+from services.alert_delivery import SmtpSession
 
 try:
     from auth.session import get_current_user
@@ -39,10 +47,39 @@ except ImportError:
         return "demo-user-1"
 
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # ✅ alerts db init
+    try:
+        init_db()
+    except Exception:
+        logger.exception("[alerts] init_db error")
+
+    # ✅ scheduler (every 10–15 mins; default 900s)
+    alerts_task: Optional["asyncio.Task[None]"] = None
+    if os.getenv("ALERTS_SCHEDULER_ENABLED", "1") == "1":
+        alerts_task = asyncio.create_task(_alerts_loop())
+
+    yield
+
+    if alerts_task is not None:
+        alerts_task.cancel()
+        try:
+            await alerts_task
+        except asyncio.CancelledError:
+            pass
+
+    close_http_client()
+
+
 app = FastAPI(
     title="FriendlyTicker API",
     description="Beginner-friendly stock momentum + AI explanation service.",
     version="0.1.0",
+    lifespan=_lifespan,
 )
 
 origins = [
@@ -60,6 +97,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Watchlist/analysis payloads are large JSON arrays; small bodies skip gzip.
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 @app.get("/version")
 def version():
     return {"version": "cors-regex-1"}
@@ -89,6 +129,43 @@ class AlertToggleRequest(BaseModel):
     enabled: bool
 
 
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _clean_email(raw: Optional[str]) -> str:
+    email = (raw or "").strip().lower()
+    if (len(email) >= 200) or not _EMAIL_RE.match(email):
+        raise HTTPException(status_code=400, detail="Please enter a valid email address.")
+    return email
+
+
+def _clean_ticker(raw: Optional[str]) -> str:
+    ticker = (raw or "").strip().upper()
+    if not ticker:
+        raise HTTPException(status_code=400, detail="Ticker is required.")
+    try:
+        return validate_ticker(ticker)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _etag_response(request: Request, payload: Any) -> Response:
+    """
+    Serialize payload once, tag it with a content hash, and answer a matching
+    If-None-Match with an empty 304 so polling clients skip the body.
+    """
+    body = orjson.dumps(payload)
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    # no-cache: the browser may keep the body but must revalidate every time,
+    # so the UI's refetch right after an add/remove/toggle never sees stale data.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 def _format_alert_email(ticker: str, signals: Dict[str, Any], reasons: List[str]) -> Dict[str, str]:
     subject = f"FriendlyTicker alert: {ticker}"
     lines = []
@@ -108,36 +185,54 @@ def _format_alert_email(ticker: str, signals: Dict[str, Any], reasons: List[str]
     return {"subject": subject, "body": body}
 
 
-def _alerts_loop() -> None:
-    interval = int(os.getenv("ALERTS_INTERVAL_SECONDS", "900"))
-    while True:
-        try:
-            triggered = run_alerts_once()
-            for t in triggered:
+def _deliver_alerts(triggered: List[Dict[str, Any]]) -> Dict[str, Any]:
+    sent = 0
+    errors: List[str] = []
+
+    # One SMTP login for the whole batch instead of one per email.
+    with SmtpSession() as smtp:
+        for t in triggered:
+            try:
                 email = t.get("email")
                 ticker = t.get("ticker")
                 signals = t.get("signals") or {}
                 reasons = t.get("reasons") or []
                 if email and ticker:
                     msg = _format_alert_email(ticker, signals, reasons)
-                    send_email(email, msg["subject"], msg["body"])
-        except Exception as e:
-            print(f"[alerts] scheduler error: {e}")
-        time.sleep(interval)
+                    smtp.send(email, msg["subject"], msg["body"])
+                    sent += 1
+            except Exception as e:
+                errors.append(str(e))
 
+    if errors:
+        logger.warning("[alerts] delivery errors (%d): %s", len(errors), errors[0])
+    return {"sent": sent, "errors": errors}
 
-@app.on_event("startup")
-def _startup() -> None:
-    # ✅ alerts db init
-    try:
-        init_db()
-    except Exception as e:
-        print(f"[alerts] init_db error: {e}")
 
-    # ✅ scheduler (every 10–15 mins; default 900s)
-    if os.getenv("ALERTS_SCHEDULER_ENABLED", "1") == "1":
-        t = threading.Thread(target=_alerts_loop, daemon=True)
-        t.start()
+def _run_alerts_tick() -> None:
+    _deliver_alerts(run_alerts_once())
+
+
+async def _alerts_loop() -> None:
+    # Runs on the app's event loop; the blocking scan + SMTP work goes to a
+    # worker thread per tick instead of pinning a dedicated thread forever.
+    interval = int(os.getenv("ALERTS_INTERVAL_SECONDS", "900"))
+    jitter = interval * 0.1  # +/-10% so restarted workers don't tick in lockstep
+    loop = asyncio.get_running_loop()
+
+    await asyncio.sleep(random.uniform(0, jitter))
+    next_run = loop.time()
+    while True:
+        try:
+            await asyncio.to_thread(_run_alerts_tick)
+        except Exception:
+            logger.exception("[alerts] scheduler error")
+
+        # Fixed cadence. Ticks missed while a slow scan was running collapse
+        # into a single immediate run instead of stacking up.
+        now = loop.time()
+        next_run = max(next_run + interval, now)
+        await asyncio.sleep(max(0.0, next_run - now + random.uniform(-jitter, jitter)))
 
 
 @app.get("/health")
@@ -145,26 +240,23 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+# Bounds how many analyses run at once. Each one mixes provider I/O with
+# momentum math, so unbounded fan-out just thrashes the worker threads.
+_ANALYZE_SEM = asyncio.Semaphore(ANALYZE_MAX_CONCURRENCY)
+
+
 @app.post("/api/analyze")
-def analyze_stock(body: AnalyzeRequest) -> Dict[str, Any]:
+async def analyze_stock(body: AnalyzeRequest) -> Dict[str, Any]:
     """
     Analyze a single stock ticker.
     """
 
-    # 🔴 STEP 1: HARD LOGGING
-    print("🚨 /api/analyze route hit")
-    print("payload:", body.dict())
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("/api/analyze payload: %s", body.dict())
 
-    ticker = (body.ticker or "").strip().upper()
-    if not ticker:
-        raise HTTPException(status_code=400, detail="Ticker is required.")
-
-    try:
-        validate_ticker(ticker)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    result = analyze_ticker(ticker)
+    ticker = _clean_ticker(body.ticker)
+    async with _ANALYZE_SEM:
+        result = await asyncio.to_thread(analyze_ticker, ticker)
 
     if isinstance(result, dict) and (result.get("ok") is False):
         raise HTTPException(status_code=400, detail=result.get("error") or "Invalid ticker.")
@@ -173,18 +265,27 @@ def analyze_stock(body: AnalyzeRequest) -> Dict[str, Any]:
 
 
 @app.get("/api/watchlist")
-def get_user_watchlist() -> List[Dict[str, Any]]:
-    user_id = get_current_user()
-    return get_watchlist_with_analysis(user_id)
+def get_user_watchlist(
+    request: Request,
+    user_id: str = Depends(get_current_user),
+) -> Response:
+    return _etag_response(request, get_watchlist_with_analysis(user_id))
+
+
+@app.get("/api/watchlist/stream")
+def stream_user_watchlist(user_id: str = Depends(get_current_user)) -> StreamingResponse:
+    # NDJSON: one analysis per line, in the order they finish.
+    lines = (orjson.dumps(item) + b"\n" for item in stream_watchlist_analyses(user_id))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
 
 
 @app.post("/api/watchlist/add")
-def add_watchlist_item(body: WatchlistModifyRequest) -> Dict[str, Any]:
-    ticker = (body.ticker or "").strip().upper()
-    if not ticker:
-        raise HTTPException(status_code=400, detail="Ticker is required.")
+def add_watchlist_item(
+    body: WatchlistModifyRequest,
+    user_id: str = Depends(get_current_user),
+) -> Dict[str, Any]:
+    ticker = _clean_ticker(body.ticker)
 
-    user_id = get_current_user()
     try:
         updated = add_to_watchlist(user_id, ticker)
         return {"ok": True, "watchlist": updated, "error": None}
@@ -195,63 +296,42 @@ def add_watchlist_item(body: WatchlistModifyRequest) -> Dict[str, Any]:
 
 
 @app.post("/api/watchlist/remove")
-def remove_watchlist_item(body: WatchlistModifyRequest) -> Dict[str, Any]:
-    ticker = (body.ticker or "").strip()
-    if not ticker:
-        raise HTTPException(status_code=400, detail="Ticker is required.")
+def remove_watchlist_item(
+    body: WatchlistModifyRequest,
+    user_id: str = Depends(get_current_user),
+) -> Dict[str, Any]:
+    ticker = _clean_ticker(body.ticker)
 
-    user_id = get_current_user()
     updated = remove_from_watchlist(user_id, ticker)
     return {"ok": True, "watchlist": updated}
 
 
 @app.post("/api/waitlist")
 def waitlist(body: WaitlistRequest) -> Dict[str, Any]:
-    email = (body.email or "").strip().lower()
-
-    if email:
-        if ("@" not in email) or (len(email) >= 200):
-            raise HTTPException(status_code=400, detail="Please enter a valid email address.")
-        save_waitlist_email(email)
+    if (body.email or "").strip():
+        save_waitlist_email(_clean_email(body.email))
 
     return {"ok": True}
 
 
 @app.post("/api/waitlist/join")
 def join_waitlist(body: WaitlistRequest) -> Dict[str, Any]:
-    email = (body.email or "").strip().lower()
-
-    if (not email) or ("@" not in email) or (len(email) >= 200):
-        raise HTTPException(status_code=400, detail="Please enter a valid email address.")
-
+    email = _clean_email(body.email)
     save_waitlist_email(email)
     return {"ok": True}
 
 
 @app.get("/api/alerts")
-def api_get_alerts(email: str) -> Dict[str, Any]:
-    email_v = (email or "").strip().lower()
-    if (not email_v) or ("@" not in email_v) or (len(email_v) >= 200):
-        raise HTTPException(status_code=400, detail="Please enter a valid email address.")
-
+def api_get_alerts(request: Request, email: str) -> Response:
+    email_v = _clean_email(email)
     rules = get_rules_for_email(email_v)
-    return {"ok": True, "rules": rules}
+    return _etag_response(request, {"ok": True, "rules": rules})
 
 
 @app.patch("/api/alerts/{ticker}")
 def api_patch_alert(ticker: str, email: str, body: AlertToggleRequest) -> Dict[str, Any]:
-    email_v = (email or "").strip().lower()
-    ticker_v = (ticker or "").strip().upper()
-
-    if (not email_v) or ("@" not in email_v) or (len(email_v) >= 200):
-        raise HTTPException(status_code=400, detail="Please enter a valid email address.")
-    if not ticker_v:
-        raise HTTPException(status_code=400, detail="Ticker is required.")
-
-    try:
-        validate_ticker(ticker_v)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    email_v = _clean_email(email)
+    ticker_v = _clean_ticker(ticker)
 
     upsert_rule(email=email_v, ticker=ticker_v, enabled=bool(body.enabled))
     return {"ok": True}
@@ -259,18 +339,8 @@ def api_patch_alert(ticker: str, email: str, body: AlertToggleRequest) -> Dict[s
 
 @app.delete("/api/alerts/{ticker}")
 def api_delete_alert(ticker: str, email: str) -> Dict[str, Any]:
-    email_v = (email or "").strip().lower()
-    ticker_v = (ticker or "").strip().upper()
-
-    if (not email_v) or ("@" not in email_v) or (len(email_v) >= 200):
-        raise HTTPException(status_code=400, detail="Please enter a valid email address.")
-    if not ticker_v:
-        raise HTTPException(status_code=400, detail="Ticker is required.")
-
-    try:
-        validate_ticker(ticker_v)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    email_v = _clean_email(email)
+    ticker_v = _clean_ticker(ticker)
 
     delete_rule(email=email_v, ticker=ticker_v)
     return {"ok": True}
@@ -279,18 +349,8 @@ def api_delete_alert(ticker: str, email: str) -> Dict[str, Any]:
 # ✅ Alerts endpoints (minimal)
 @app.post("/alerts/upsert")
 def alerts_upsert(body: AlertUpsertRequest) -> Dict[str, Any]:
-    email = (body.email or "").strip().lower()
-    ticker = (body.ticker or "").strip().upper()
-
-    if (not email) or ("@" not in email) or (len(email) >= 200):
-        raise HTTPException(status_code=400, detail="Please enter a valid email address.")
-    if not ticker:
-        raise HTTPException(status_code=400, detail="Ticker is required.")
-
-    try:
-        validate_ticker(ticker)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    email = _clean_email(body.email)
+    ticker = _clean_ticker(body.ticker)
 
     upsert_rule(email=email, ticker=ticker, enabled=bool(body.enabled))
     return {"ok": True}
@@ -303,29 +363,32 @@ def alerts_status() -> Dict[str, Any]:
 
 
 @app.post("/alerts/run_once")
-def alerts_run_once() -> Dict[str, Any]:
+def alerts_run_once(background_tasks: BackgroundTasks) -> Dict[str, Any]:
     triggered = run_alerts_once()
-    sent = 0
-    errors: List[str] = []
 
-    for t in triggered:
-        try:
-            email = t.get("email")
-            ticker = t.get("ticker")
-            signals = t.get("signals") or {}
-            reasons = t.get("reasons") or []
-            if email and ticker:
-                msg = _format_alert_email(ticker, signals, reasons)
-                send_email(email, msg["subject"], msg["body"])
-                sent += 1
-        except Exception as e:
-            errors.append(str(e))
+    # SMTP delivery runs after the response is sent, so the request
+    # doesn't wait on one mail round-trip per triggered alert.
+    if triggered:
+        background_tasks.add_task(_deliver_alerts, triggered)
 
-    return {"ok": True, "triggered": triggered, "sent": sent, "errors": errors}
+    return {"ok": True, "triggered": triggered, "queued": len(triggered)}
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
+
+    dev = os.getenv("DEV", "0") == "1"
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=dev,
+        # Every worker starts its own alerts scheduler, so stay at 1 unless
+        # ALERTS_SCHEDULER_ENABLED=0 and alerts are driven from elsewhere.
+        workers=1 if dev else int(os.getenv("WEB_CONCURRENCY", "1")),
+        # "auto" picks uvloop + httptools when installed (uvicorn[standard]).
+        loop="auto",
+        http="auto",
+    )
 
 
@@ -6,13 +6,14 @@ and provides sane defaults so the app can boot locally.
 """
 
 import os
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Dict, Any
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-# Load environment variables from the .env file NEXT TO THIS FILE
+# Load environment variables from the .env file NEXT TO THIS FILE.
+# This is the only load_dotenv in the app; import config before reading env.
 ENV_PATH = Path(__file__).resolve().parent / ".env"
 load_dotenv(ENV_PATH)
 
@@ -42,29 +43,6 @@ def _get_str(name: str, default: str = "") -> str:
     return default if raw is None else raw
 
 
-# ---------------------------
-# External API Keys
-# ---------------------------
-STOCK_API_KEY: str = _get_str("STOCK_API_KEY", "")
-AI_API_KEY: str = _get_str("AI_API_KEY", "")
-
-# ---------------------------
-# Core Momentum Settings
-# ---------------------------
-DEFAULT_LOOKBACK_DAYS: int = _get_int("DEFAULT_LOOKBACK_DAYS", 90)
-MOMENTUM_SHIFT_THRESHOLD: float = _get_float("MOMENTUM_SHIFT_THRESHOLD", 5.0)
-
-# ---------------------------
-# AI Settings
-# ---------------------------
-AI_MODEL: str = _get_str("AI_MODEL", "gpt-4o-mini")
-
-# ---------------------------
-# Monetization / Limits
-# ---------------------------
-MAX_FREE_WATCHLIST: int = _get_int("MAX_FREE_WATCHLIST", 5)
-
-
 @dataclass(frozen=True)
 class Settings:
     STOCK_API_KEY: str
@@ -73,19 +51,67 @@ class Settings:
     MOMENTUM_SHIFT_THRESHOLD: float
     AI_MODEL: str
     MAX_FREE_WATCHLIST: int
+    MARKET_DATA_STALE_SECONDS: int
+    MARKET_DATA_MAX_CONCURRENCY: int
+    WATCHLIST_RESTAT_SECONDS: float
+    ANALYZE_MAX_CONCURRENCY: int
 
 
-def get_settings() -> Dict[str, Any]:
+def _parse_env() -> Dict[str, Any]:
     return {
-        "STOCK_API_KEY": STOCK_API_KEY,
-        "AI_API_KEY": AI_API_KEY,
-        "DEFAULT_LOOKBACK_DAYS": DEFAULT_LOOKBACK_DAYS,
-        "MOMENTUM_SHIFT_THRESHOLD": MOMENTUM_SHIFT_THRESHOLD,
-        "AI_MODEL": AI_MODEL,
-        "MAX_FREE_WATCHLIST": MAX_FREE_WATCHLIST,
+        # ---------------------------
+        # External API Keys
+        # ---------------------------
+        "STOCK_API_KEY": _get_str("STOCK_API_KEY", ""),
+        "AI_API_KEY": _get_str("AI_API_KEY", ""),
+        # ---------------------------
+        # Core Momentum Settings
+        # ---------------------------
+        "DEFAULT_LOOKBACK_DAYS": _get_int("DEFAULT_LOOKBACK_DAYS", 90),
+        "MOMENTUM_SHIFT_THRESHOLD": _get_float("MOMENTUM_SHIFT_THRESHOLD", 5.0),
+        # ---------------------------
+        # AI Settings
+        # ---------------------------
+        "AI_MODEL": _get_str("AI_MODEL", "gpt-4o-mini"),
+        # ---------------------------
+        # Monetization / Limits
+        # ---------------------------
+        "MAX_FREE_WATCHLIST": _get_int("MAX_FREE_WATCHLIST", 5),
+        # ---------------------------
+        # Market Data Provider
+        # ---------------------------
+        "MARKET_DATA_STALE_SECONDS": _get_int("MARKET_DATA_STALE_SECONDS", 600),
+        "MARKET_DATA_MAX_CONCURRENCY": _get_int("MARKET_DATA_MAX_CONCURRENCY", 5),
+        # ---------------------------
+        # Watchlist Store
+        # ---------------------------
+        "WATCHLIST_RESTAT_SECONDS": _get_float("WATCHLIST_RESTAT_SECONDS", 0.0),
+        # ---------------------------
+        # API Server
+        # ---------------------------
+        "ANALYZE_MAX_CONCURRENCY": _get_int("ANALYZE_MAX_CONCURRENCY", (os.cpu_count() or 4) * 2),
     }
 
 
-def get_settings_obj() -> Settings:
-    return Settings(**get_settings())
+# Parsed once per process.
+SETTINGS: Settings = Settings(**_parse_env())
 
+# Module-level names kept for `from config import X` call sites.
+STOCK_API_KEY: str = SETTINGS.STOCK_API_KEY
+AI_API_KEY: str = SETTINGS.AI_API_KEY
+DEFAULT_LOOKBACK_DAYS: int = SETTINGS.DEFAULT_LOOKBACK_DAYS
+MOMENTUM_SHIFT_THRESHOLD: float = SETTINGS.MOMENTUM_SHIFT_THRESHOLD
+AI_MODEL: str = SETTINGS.AI_MODEL
+MAX_FREE_WATCHLIST: int = SETTINGS.MAX_FREE_WATCHLIST
+MARKET_DATA_STALE_SECONDS: int = SETTINGS.MARKET_DATA_STALE_SECONDS
+MARKET_DATA_MAX_CONCURRENCY: int = SETTINGS.MARKET_DATA_MAX_CONCURRENCY
+WATCHLIST_RESTAT_SECONDS: float = SETTINGS.WATCHLIST_RESTAT_SECONDS
+ANALYZE_MAX_CONCURRENCY: int = SETTINGS.ANALYZE_MAX_CONCURRENCY
+
+
+def get_settings() -> Dict[str, Any]:
+    return asdict(SETTINGS)
+
+
+def get_settings_obj() -> Settings:
+    return SETTINGS
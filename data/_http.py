@@ -0,0 +1,59 @@
+"""
+data/_http.py
+Shared HTTP plumbing for the Alpha Vantage data provider.
+
+One keep-alive client serves price history, company profiles and news,
+so a ticker analysis reuses a single connection instead of opening a new
+TCP/TLS session per request.
+"""
+
+import threading
+
+import httpx
+
+from config import MARKET_DATA_MAX_CONCURRENCY, STOCK_API_KEY
+
+
+def _new_client():
+    return httpx.Client(
+        base_url="https://www.alphavantage.co",
+        timeout=5.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+    )
+
+
+# httpx.Client is thread-safe, so the sync routes FastAPI runs in its
+# threadpool can all share it.
+client = _new_client()
+_CLIENT_LOCK = threading.Lock()
+
+# Max provider requests in flight at once (Alpha Vantage's free tier is tight).
+_PROVIDER_SEM = threading.BoundedSemaphore(MARKET_DATA_MAX_CONCURRENCY)
+
+
+def alpha_vantage_query(**params):
+    """
+    GET /query with the given params (plus the API key) and return the JSON body.
+    """
+    with _PROVIDER_SEM:
+        response = _get_client().get("/query", params={**params, "apikey": STOCK_API_KEY})
+    return response.json()
+
+
+def _get_client():
+    """
+    Return the shared client, reopening it if a previous app lifespan closed it.
+    """
+    global client
+    if client.is_closed:
+        with _CLIENT_LOCK:
+            if client.is_closed:
+                client = _new_client()
+    return client
+
+
+def close_client():
+    """
+    Close the shared HTTP client (called on app shutdown).
+    """
+    client.close()
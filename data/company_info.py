@@ -10,8 +10,7 @@ Per MVP + product vision:
     - Provide only the context needed for AI summaries.
 """
 
-import requests
-from config import STOCK_API_KEY
+from data._http import alpha_vantage_query
 
 
 def fetch_company_profile(ticker):
@@ -29,16 +28,8 @@ def fetch_company_profile(ticker):
         - If API fails, return a safe fallback profile.
     """
 
-    url = (
-        "https://www.alphavantage.co/query"
-        f"?function=OVERVIEW"
-        f"&symbol={ticker}"
-        f"&apikey={STOCK_API_KEY}"
-    )
-
     try:
-        response = requests.get(url, timeout=5)
-        data = response.json()
+        data = alpha_vantage_query(function="OVERVIEW", symbol=ticker)
 
         return {
             "name": data.get("Name", ticker),
@@ -69,16 +60,8 @@ def fetch_recent_news(ticker):
         - Use simple text suitable for AI summaries.
     """
 
-    url = (
-        "https://www.alphavantage.co/query"
-        f"?function=NEWS_SENTIMENT"
-        f"&tickers={ticker}"
-        f"&apikey={STOCK_API_KEY}"
-    )
-
     try:
-        response = requests.get(url, timeout=5)
-        data = response.json()
+        data = alpha_vantage_query(function="NEWS_SENTIMENT", tickers=ticker)
 
         articles = data.get("feed", [])
         formatted = []
@@ -3,10 +3,12 @@ data/market_data_source.py
 Responsible for fetching raw price history for a ticker.
 """
 
+import threading
 import time
-import requests
+from contextlib import contextmanager
 
-from config import STOCK_API_KEY, DEFAULT_LOOKBACK_DAYS
+from config import DEFAULT_LOOKBACK_DAYS, MARKET_DATA_STALE_SECONDS
+from data._http import alpha_vantage_query
 
 # ✅ Step 6: in-memory cache to avoid hammering data provider
 # { "AAPL": (timestamp_epoch_seconds, price_history_list) }
@@ -19,37 +21,48 @@ try:
 except Exception:
     _CACHE_TTL_SECONDS = 120
 
+# Stale-while-revalidate window: past the TTL but younger than this, the
+# cached prices are served immediately and refreshed in the background.
+_CACHE_STALE_SECONDS = MARKET_DATA_STALE_SECONDS
+
+# Tickers with a background refresh already running (one refresh per ticker).
+_REFRESHING = set()
+_REFRESHING_LOCK = threading.Lock()
+
+# Single-flight: one lock per ticker so concurrent cache misses for the same
+# ticker (user requests racing the alerts scan) make one provider call.
+# { "AAPL": [lock, holders_and_waiters] } -- dropped when the count hits 0,
+# so the dict only holds tickers with a fetch in flight.
+_FETCH_LOCKS = {}
+_FETCH_LOCKS_GUARD = threading.Lock()
+
+
+@contextmanager
+def _fetch_lock(t):
+    with _FETCH_LOCKS_GUARD:
+        entry = _FETCH_LOCKS.get(t)
+        if entry is None:
+            entry = _FETCH_LOCKS[t] = [threading.Lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _FETCH_LOCKS_GUARD:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _FETCH_LOCKS[t]
 
-def fetch_price_history(ticker):
+
+def _fetch_from_provider(t):
     """
-    Fetch recent price history for the given ticker.
+    Call the data provider and return a validated price history list.
 
-    Returns:
-        A list of dicts ordered from oldest → newest.
-        Example: [{"close": 172.30, "volume": 1234567}, ...]
     Raises:
         ValueError if no usable market data is found.
     """
-    t = (ticker or "").strip().upper()
-
-    # ✅ Step 6: serve cached if fresh
-    now = time.time()
-    cached = _PRICE_CACHE.get(t)
-    if cached:
-        cached_ts, cached_prices = cached
-        if (now - cached_ts) < _CACHE_TTL_SECONDS:
-            return cached_prices
-
-    url = (
-        "https://www.alphavantage.co/query"
-        f"?function=TIME_SERIES_DAILY"
-        f"&symbol={t}"
-        f"&apikey={STOCK_API_KEY}"
-    )
-
     try:
-        response = requests.get(url, timeout=5)
-        data = response.json()
+        data = alpha_vantage_query(function="TIME_SERIES_DAILY", symbol=t)
 
         time_series = data.get("Time Series (Daily)", {}) or {}
 
@@ -72,9 +85,6 @@ def fetch_price_history(ticker):
         if len(price_history) < DEFAULT_LOOKBACK_DAYS:
             raise ValueError("Ticker not found or insufficient price history.")
 
-        # ✅ Step 6: store in cache
-        _PRICE_CACHE[t] = (now, price_history)
-
         return price_history
 
     except ValueError:
@@ -85,3 +95,62 @@ def fetch_price_history(ticker):
         # ❌ Phase 1: REMOVE dummy fallback — treat as failure
         raise ValueError("Ticker not found or insufficient price history.")
 
+
+def _refresh(t):
+    try:
+        with _fetch_lock(t):
+            price_history = _fetch_from_provider(t)
+            _PRICE_CACHE[t] = (time.time(), price_history)
+    except Exception:
+        # Keep serving the stale entry; the next request past TTL retries.
+        pass
+    finally:
+        with _REFRESHING_LOCK:
+            _REFRESHING.discard(t)
+
+
+def _refresh_in_background(t):
+    with _REFRESHING_LOCK:
+        if t in _REFRESHING:
+            return
+        _REFRESHING.add(t)
+    threading.Thread(target=_refresh, args=(t,), daemon=True).start()
+
+
+def fetch_price_history(ticker):
+    """
+    Fetch recent price history for the given ticker.
+
+    Returns:
+        A list of dicts ordered from oldest → newest.
+        Example: [{"close": 172.30, "volume": 1234567}, ...]
+    Raises:
+        ValueError if no usable market data is found.
+    """
+    t = (ticker or "").strip().upper()
+
+    # ✅ Step 6: serve cached if fresh (or stale, while it revalidates)
+    now = time.time()
+    cached = _PRICE_CACHE.get(t)
+    if cached:
+        cached_ts, cached_prices = cached
+        age = now - cached_ts
+        if age < _CACHE_TTL_SECONDS:
+            return cached_prices
+        if age < _CACHE_STALE_SECONDS:
+            _refresh_in_background(t)
+            return cached_prices
+
+    with _fetch_lock(t):
+        # Another thread may have filled the cache while we waited.
+        cached = _PRICE_CACHE.get(t)
+        if cached and (time.time() - cached[0]) < _CACHE_TTL_SECONDS:
+            return cached[1]
+
+        price_history = _fetch_from_provider(t)
+
+        # ✅ Step 6: store in cache
+        _PRICE_CACHE[t] = (now, price_history)
+
+    return price_history
+
@@ -8,6 +8,7 @@ Health Score = weighted subscores:
 """
 
 import math
+from bisect import bisect_right
 
 HEALTH_WINDOW_DAYS = 200
 METRIC_NAME = "Health Score"
@@ -29,7 +30,7 @@ def _stdev(xs):
     if not xs or len(xs) < 2:
         return 0.0
     m = _mean(xs)
-    var = sum((x - m) ** 2 for x in xs) / (len(xs) - 1)
+    var = sum([(x - m) ** 2 for x in xs]) / (len(xs) - 1)
     return math.sqrt(max(0.0, var))
 
 
@@ -37,9 +38,10 @@ def _ema(values, period):
     if not values or period <= 1:
         return values[-1] if values else 0.0
     k = 2.0 / (period + 1.0)
+    k1 = 1.0 - k
     e = values[0]
-    for v in values[1:]:
-        e = (v * k) + (e * (1.0 - k))
+    for i in range(1, len(values)):
+        e = (values[i] * k) + (e * k1)
     return e
 
 
@@ -74,33 +76,107 @@ def _max_drawdown(prices):
 def _rsi(prices, period=14):
     if not prices or len(prices) < period + 1:
         return 50.0
-    gains = []
-    losses = []
-    for i in range(1, len(prices)):
-        diff = prices[i] - prices[i - 1]
-        gains.append(max(0.0, diff))
-        losses.append(max(0.0, -diff))
+    diffs = [b - a for a, b in zip(prices, prices[1:])]
+    gains = [d if d > 0 else 0.0 for d in diffs]
+    losses = [-d if d < 0 else 0.0 for d in diffs]
 
     avg_gain = _mean(gains[:period])
     avg_loss = _mean(losses[:period])
 
-    for i in range(period, len(gains)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    m = period - 1
+    for i in range(period, len(diffs)):
+        avg_gain = (avg_gain * m + gains[i]) / period
+        avg_loss = (avg_loss * m + losses[i]) / period
 
+    return _rsi_from_averages(avg_gain, avg_loss)
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
     if avg_loss == 0:
         return 100.0
     rs = avg_gain / avg_loss
     return 100.0 - (100.0 / (1.0 + rs))
 
 
+def _rsi_series(prices, period=14):
+    """
+    RSI of every prefix in one forward pass: out[n] == _rsi(prices[:n], period).
+    Wilder smoothing only ever extends the previous state, so each prefix
+    is one step past the last instead of a rescan from the start.
+    """
+    n = len(prices)
+    out = [50.0] * (n + 1)
+    if n < period + 1:
+        return out
+
+    diffs = [b - a for a, b in zip(prices, prices[1:])]
+    gains = [d if d > 0 else 0.0 for d in diffs]
+    losses = [-d if d < 0 else 0.0 for d in diffs]
+
+    avg_gain = _mean(gains[:period])
+    avg_loss = _mean(losses[:period])
+    out[period + 1] = _rsi_from_averages(avg_gain, avg_loss)
+
+    m = period - 1
+    for i in range(period, len(diffs)):
+        avg_gain = (avg_gain * m + gains[i]) / period
+        avg_loss = (avg_loss * m + losses[i]) / period
+        out[i + 2] = _rsi_from_averages(avg_gain, avg_loss)
+    return out
+
+
 def _normalize_linear(x, x0, x1):
     if x0 == x1:
         return 0.5
     return _clamp((x - x0) / (x1 - x0))
 
 
+_NUMBER_TYPES = frozenset((int, float))
+_DICT_TYPES = frozenset((dict,))
+_is_positive = (0.0).__lt__
+_is_non_negative = (0.0).__le__
+
+
+def _extract_series_from_dicts(price_history):
+    # Fast path for the provider shape: every item is a dict with numeric
+    # "close" > 0 and "volume" >= 0. Returns None to defer to the generic path.
+    if set(map(type, price_history)) != _DICT_TYPES:
+        return None
+    try:
+        closes = [d["close"] for d in price_history]
+        vols = [d["volume"] for d in price_history]
+    except KeyError:
+        return None
+    if not (set(map(type, closes)) <= _NUMBER_TYPES and set(map(type, vols)) <= _NUMBER_TYPES):
+        return None
+    if not (all(map(_is_positive, closes)) and all(map(_is_non_negative, vols))):
+        return None
+    if len(closes) < 10:
+        return [], None
+    return list(map(float, closes)), list(map(float, vols))
+
+
+def _extract_series_from_numbers(price_history):
+    if not set(map(type, price_history)) <= _NUMBER_TYPES:
+        return None
+    if not all(map(_is_positive, price_history)):
+        return None
+    if len(price_history) < 10:
+        return [], None
+    return list(map(float, price_history)), None
+
+
 def _extract_series(price_history):
+    if price_history:
+        first = price_history[0]
+        fast = None
+        if isinstance(first, dict):
+            fast = _extract_series_from_dicts(price_history)
+        elif isinstance(first, (int, float)):
+            fast = _extract_series_from_numbers(price_history)
+        if fast is not None:
+            return fast
+
     prices = []
     vols = []
     has_vol = True
@@ -130,6 +206,39 @@ def _extract_series(price_history):
     return prices, vols
 
 
+def _curve_score_exact(blended):
+    curved = 1.0 / (1.0 + math.exp(-6.0 * (blended - 0.5)))
+    return int(round(100 * curved))
+
+
+def _build_curve_cuts():
+    """
+    The curved score is a step function of blended in [0, 1], so store the
+    exact blended value where each integer step starts (found by bisecting
+    down to adjacent floats) and look scores up with one bisect.
+    """
+    base = _curve_score_exact(0.0)
+    cuts = []
+    for k in range(base + 1, _curve_score_exact(1.0) + 1):
+        lo, hi = 0.0, 1.0
+        while math.nextafter(lo, hi) < hi:
+            mid = (lo + hi) / 2.0
+            if _curve_score_exact(mid) >= k:
+                hi = mid
+            else:
+                lo = mid
+        cuts.append(hi)
+    return base, cuts
+
+
+_CURVE_BASE, _CURVE_CUTS = _build_curve_cuts()
+
+
+def _curve_score(blended):
+    # Same result as _curve_score_exact for blended in [0, 1].
+    return _CURVE_BASE + bisect_right(_CURVE_CUTS, blended)
+
+
 # ----------------------------
 # Subscores
 # ----------------------------
@@ -158,18 +267,29 @@ def _structure_subscore(prices):
     return _clamp(score)
 
 
-def _momentum_subscore(prices):
-    rsi = _rsi(prices, 14)
+def _momentum_subscore(prices, rsi=None):
+    if rsi is None:
+        rsi = _rsi(prices, 14)
+    return _momentum_subscore_at(prices, len(prices), rsi)
+
+
+def _momentum_subscore_at(prices, end, rsi):
+    """
+    Momentum subscore of prices[:end] given its RSI, without copying the
+    prefix (only the 60-bar EMA window is sliced).
+    """
     rsi_score = 1.0 - _normalize_linear(abs(rsi - 60.0), 0.0, 30.0)
 
-    if len(prices) >= 21:
-        roc20 = _pct_change(prices[-21], prices[-1])
+    last = prices[end - 1]
+    if end >= 21:
+        roc20 = _pct_change(prices[end - 21], last)
     else:
-        roc20 = _pct_change(prices[0], prices[-1])
+        roc20 = _pct_change(prices[0], last)
     roc_score = _normalize_linear(roc20, -0.10, 0.10)
 
-    ema12 = _ema(prices[-60:], 12)
-    ema26 = _ema(prices[-60:], 26)
+    window = prices[max(0, end - 60):end]
+    ema12 = _ema(window, 12)
+    ema26 = _ema(window, 26)
     macd_like = _pct_change(ema26, ema12)
     macd_score = _normalize_linear(macd_like, -0.03, 0.03)
 
@@ -182,9 +302,8 @@ def _momentum_subscore(prices):
 
 
 def _risk_subscore(prices):
-    rets = []
-    for i in range(1, len(prices)):
-        rets.append(math.log(prices[i] / prices[i - 1]))
+    log = math.log
+    rets = [log(b / a) for a, b in zip(prices, prices[1:])]
 
     vol = _stdev(rets)
     mdd = _max_drawdown(prices[-120:])
@@ -258,8 +377,7 @@ def _compute_components(price_history):
     )
     blended = _clamp(blended)
 
-    curved = 1.0 / (1.0 + math.exp(-6.0 * (blended - 0.5)))
-    score = int(round(100 * curved))
+    score = _curve_score(blended)
 
     max_score = int(round(30 + 70 * s_risk))
     score = min(score, max_score)
@@ -312,18 +430,24 @@ def calculate_momentum_with_delta(price_history):
     prices, _vols = _extract_series(price_history)
     if prices and len(prices) >= (LOOKBACK_DAYS + PRESSURE_VOL_WINDOW + 20):
         # Use the same momentum definition as the rest of the system.
-        momentum_now = _momentum_subscore(prices)
-        momentum_past = _momentum_subscore(prices[:-LOOKBACK_DAYS])
-        raw_delta = momentum_now - momentum_past
+        # RSI for every prefix comes from one pass instead of ~30 rescans.
+        # Prefixes are addressed by end index, so nothing is copied per step.
+        n = len(prices)
+        rsi_at = _rsi_series(prices, 14)
+
+        def momentum_at(end):
+            return _momentum_subscore_at(prices, end, rsi_at[end])
+
+        raw_delta = momentum_at(n) - momentum_at(n - LOOKBACK_DAYS)
 
         # Estimate how "big" a delta is for this ticker (recent distribution).
         recent_deltas = []
         for i in range(1, PRESSURE_VOL_WINDOW + 1):
-            p_now = prices[:-i]
-            p_past = prices[:-(i + LOOKBACK_DAYS)]
-            if len(p_past) < 30:
+            end_now = n - i
+            end_past = end_now - LOOKBACK_DAYS
+            if end_past < 30:
                 break
-            recent_deltas.append(_momentum_subscore(p_now) - _momentum_subscore(p_past))
+            recent_deltas.append(momentum_at(end_now) - momentum_at(end_past))
 
         mom_vol = _stdev(recent_deltas) if len(recent_deltas) >= 5 else 0.01
         if mom_vol <= 0:
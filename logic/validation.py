@@ -4,6 +4,13 @@ Pure logic: validates ticker symbols before any data or AI work happens.
 No API calls. No business logic. Simple, beginner-friendly checks.
 """
 
+import sys
+
+# Deletes every allowed character (letters, "." and "-"); anything left
+# over after translate() is invalid.
+_DISALLOWED_ONLY = str.maketrans("", "", "ABCDEFGHIJKLMNOPQRSTUVWXYZ.-")
+
+
 def validate_ticker(ticker: str) -> str:
     """
     Validates a stock ticker string (MVP rules).
@@ -15,7 +22,8 @@ def validate_ticker(ticker: str) -> str:
     - else raise ValueError
 
     Returns:
-        cleaned, uppercased ticker symbol.
+        cleaned, uppercased ticker symbol (interned, so the same ticker
+        shared across rules, state rows and dict keys is one object).
 
     Raises:
         ValueError if ticker is invalid.
@@ -30,10 +38,8 @@ def validate_ticker(ticker: str) -> str:
     if len(cleaned) < 1 or len(cleaned) > 10:
         raise ValueError("Ticker must be 1–10 characters.")
 
-    allowed = set("ABCDEFGHIJKLMNOPQRSTUVWXYZ.-")
-    for ch in cleaned:
-        if ch not in allowed:
-            raise ValueError("Ticker may only contain letters, '.' or '-'.")
+    if cleaned.translate(_DISALLOWED_ONLY):
+        raise ValueError("Ticker may only contain letters, '.' or '-'.")
 
-    return cleaned
+    return sys.intern(cleaned)
 
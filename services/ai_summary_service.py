@@ -1,7 +1,7 @@
 # services/ai_summary_service.py
 
-
-from typing import List, Dict, Any, Optional
+import logging
+from typing import List, Dict, Any, Optional, Tuple
 
 # ✅ Step 8 fix: make OpenAI import optional so missing package doesn't crash app
 try:
@@ -11,12 +11,37 @@ except ModuleNotFoundError:
 
 from config import AI_API_KEY, AI_MODEL
 
+logger = logging.getLogger(__name__)
+
 # ✅ Step 8: Only initialize OpenAI client if:
 #   - openai package is installed
 #   - AND a key exists
 client: Optional["OpenAI"] = OpenAI(api_key=AI_API_KEY) if (OpenAI and AI_API_KEY) else None
 
 
+# Labels logic/momentum.py already emits: exact match, no scanning.
+_CANONICAL_REGIMES = {
+    "uptrend": "Uptrend",
+    "downtrend": "Downtrend",
+    "sideways": "Sideways",
+}
+
+# Substring heuristics for anything else, checked in order (first hit wins).
+# "strong" sits after "down" so "strong downtrend" stays a Downtrend.
+_REGIME_TOKENS = (
+    ("up", "Uptrend"),
+    ("bull", "Uptrend"),
+    ("down", "Downtrend"),
+    ("strong", "Uptrend"),
+    ("bear", "Downtrend"),
+    ("weak", "Downtrend"),
+    ("side", "Sideways"),
+    ("range", "Sideways"),
+    ("flat", "Sideways"),
+    ("chop", "Sideways"),
+)
+
+
 def _derive_regime(trend_label: str) -> str:
     """
     Convert your internal momentum label into a simple swing-trader regime:
@@ -24,19 +49,61 @@ def _derive_regime(trend_label: str) -> str:
     """
     label = (trend_label or "").strip().lower()
 
-    # Heuristic mapping (MVP-safe). If your labels are already "Uptrend/Downtrend/Sideways",
-    # this will still map correctly.
-    if "up" in label or "bull" in label or "strong" in label and "down" not in label:
-        return "Uptrend"
-    if "down" in label or "bear" in label or "weak" in label:
-        return "Downtrend"
-    if "side" in label or "range" in label or "flat" in label or "chop" in label:
-        return "Sideways"
+    regime = _CANONICAL_REGIMES.get(label)
+    if regime:
+        return regime
+
+    # Heuristic mapping (MVP-safe) for free-form labels.
+    for token, regime in _REGIME_TOKENS:
+        if token in label:
+            return regime
 
     # Default (neutral)
     return "Sideways"
 
 
+# delta_1d bucket -> (prompt line, fallback sentence)
+_DELTA_TEXT = {
+    "sharp_drop": (
+        "Confidence Delta (1D): sharply lower (cooling).",
+        "Trend confidence dropped sharply since the last close, which suggests momentum is cooling.",
+    ),
+    "drop": (
+        "Confidence Delta (1D): moderately lower (cooling).",
+        "Trend confidence fell since the last close, which suggests momentum is cooling.",
+    ),
+    "rise": (
+        "Confidence Delta (1D): higher (strengthening).",
+        "Trend confidence improved since the last close, which suggests momentum is strengthening.",
+    ),
+    "flat": (
+        "Confidence Delta (1D): roughly unchanged.",
+        "Trend confidence is roughly unchanged since the last close.",
+    ),
+}
+
+
+def _classify_delta(delta_1d: Any) -> Tuple[Optional[str], str, str]:
+    """
+    Bucket the 1-day confidence delta once for both the prompt and the fallback.
+    Returns (bucket, prompt_line, fallback_sentence); empty strings when missing.
+    """
+    if not isinstance(delta_1d, (int, float)):
+        return None, "", ""
+
+    if delta_1d <= -8:
+        bucket = "sharp_drop"
+    elif delta_1d <= -4:
+        bucket = "drop"
+    elif delta_1d >= 4:
+        bucket = "rise"
+    else:
+        bucket = "flat"
+
+    prompt_line, sentence = _DELTA_TEXT[bucket]
+    return bucket, prompt_line, sentence
+
+
 def generate_ai_summary(
     ticker: str,
     company_profile: Dict[str, Any],
@@ -54,45 +121,35 @@ def generate_ai_summary(
     - If AI_API_KEY is missing, return deterministic fallback immediately (no cost)
     """
 
-    print("🚨 generate_ai_summary hit")
-    print("payload:", {
-        "ticker": ticker,
-        "company_profile_keys": list((company_profile or {}).keys())[:20],
-        "news_len": len(news) if isinstance(news, list) else None,
-        "momentum_keys": list((momentum or {}).keys())[:20],
-    })
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "generate_ai_summary: ticker=%s profile_keys=%s news_len=%s momentum_keys=%s",
+            ticker,
+            list((company_profile or {}).keys())[:20],
+            len(news) if isinstance(news, list) else None,
+            list((momentum or {}).keys())[:20],
+        )
 
     # ----------------------------
     # Defensive defaults
     # ----------------------------
     ticker = (ticker or "").upper().strip() or "UNKNOWN"
+    cp = company_profile or {}
+    m = momentum or {}
 
     company_name = (
-        (company_profile or {}).get("name")
-        or (company_profile or {}).get("company_name")
+        cp.get("name")
+        or cp.get("company_name")
         or ticker
     )
-    sector = (company_profile or {}).get("sector", "an unknown sector")
-    description = (company_profile or {}).get(
-        "description",
-        "The company operates in its industry, but detailed information is limited."
-    )
-
-    trend_label = (momentum or {}).get("label", "Sideways")
-    trend_score = (momentum or {}).get("score", 0)
-    delta_1d = (momentum or {}).get("delta_since_close", None)
+    sector = cp.get("sector", "an unknown sector")
 
-    # NEW (prompt-only usage): still reading the backend field "momentum_decay"
-    # but we describe it in prompt as "Trend Pressure"
-    momentum_decay = (momentum or {}).get("momentum_decay", None)
+    trend_label = m.get("label", "Sideways")
+    trend_score = m.get("score", 0)
+    delta_1d = m.get("delta_since_close", None)
 
     regime = _derive_regime(trend_label)
 
-    # Use only the most relevant headline (keep it simple)
-    headline = ""
-    if news and isinstance(news, list):
-        headline = (news[0] or {}).get("headline", "") or ""
-
     # ✅ Hard fallback: if key missing OR openai not installed, do NOT call OpenAI
     if not AI_API_KEY or client is None:
         return fallback_summary(
@@ -108,6 +165,21 @@ def generate_ai_summary(
     # ----------------------------
     # Prompt construction
     # ----------------------------
+    # Everything below is prompt-only, so it is skipped on the fallback path.
+    description = cp.get(
+        "description",
+        "The company operates in its industry, but detailed information is limited."
+    )
+
+    # NEW (prompt-only usage): still reading the backend field "momentum_decay"
+    # but we describe it in prompt as "Trend Pressure"
+    momentum_decay = m.get("momentum_decay", None)
+
+    # Use only the most relevant headline (keep it simple)
+    headline = ""
+    if news and isinstance(news, list):
+        headline = (news[0] or {}).get("headline", "") or ""
+
     system_prompt = (
         "You are an assistant for a swing-trader analytics app. "
         "Write neutral, descriptive context that explains what the user is seeing (not instructions). "
@@ -120,16 +192,7 @@ def generate_ai_summary(
     )
 
     # Provide a compact delta hint (still descriptive, not advice)
-    delta_line = ""
-    if isinstance(delta_1d, (int, float)):
-        if delta_1d <= -8:
-            delta_line = "Confidence Delta (1D): sharply lower (cooling)."
-        elif delta_1d <= -4:
-            delta_line = "Confidence Delta (1D): moderately lower (cooling)."
-        elif delta_1d >= 4:
-            delta_line = "Confidence Delta (1D): higher (strengthening)."
-        else:
-            delta_line = "Confidence Delta (1D): roughly unchanged."
+    _, delta_line, _ = _classify_delta(delta_1d)
 
     # Trend Pressure mapping guidance (prompt-only; frontend can rename label separately)
     # momentum_decay can be: "None", "Mild", "Elevated" (or missing)
@@ -184,7 +247,7 @@ Do not give advice. Do not predict. Do not add targets. Do not mention news if H
     # OpenAI call
     # ----------------------------
 
-    print("🔥 calling OpenAI now")
+    logger.debug("calling OpenAI for %s", ticker)
 
     try:
         response = client.chat.completions.create(
@@ -209,7 +272,7 @@ Do not give advice. Do not predict. Do not add targets. Do not mention news if H
         )
 
     except Exception as e:
-        print("❌ OPENAI ERROR:", repr(e))
+        logger.warning("OpenAI error for %s: %r", ticker, e)
         raise
 
 
@@ -227,16 +290,7 @@ def fallback_summary(
     Must be neutral, short, and not contradictory (2–4 sentences).
     """
     # Describe delta without advice
-    delta_sentence = ""
-    if isinstance(delta_1d, (int, float)):
-        if delta_1d <= -8:
-            delta_sentence = "Trend confidence dropped sharply since the last close, which suggests momentum is cooling."
-        elif delta_1d <= -4:
-            delta_sentence = "Trend confidence fell since the last close, which suggests momentum is cooling."
-        elif delta_1d >= 4:
-            delta_sentence = "Trend confidence improved since the last close, which suggests momentum is strengthening."
-        else:
-            delta_sentence = "Trend confidence is roughly unchanged since the last close."
+    _, _, delta_sentence = _classify_delta(delta_1d)
 
     # Sentence 1 includes Regime + Trend Confidence (ONE sentence)
     s1 = f"{company_name} ({ticker}) is currently in a {regime} with Trend Confidence at {trend_score}/100."
@@ -3,25 +3,75 @@
 import os
 import smtplib
 from email.message import EmailMessage
+from typing import Optional
+
+
+class SmtpSession:
+    """
+    One SMTP connection (STARTTLS + LOGIN) reused for a batch of emails.
+
+        with SmtpSession() as smtp:
+            for ...:
+                smtp.send(to, subject, body)
+
+    The connection is opened on the first send, so an empty batch costs
+    nothing and configuration errors surface per message like send_email.
+    """
+
+    def __init__(self) -> None:
+        self.host = os.getenv("SMTP_HOST")
+        self.port = int(os.getenv("SMTP_PORT", "587"))
+        self.username = os.getenv("SMTP_USERNAME")
+        self.password = os.getenv("SMTP_PASSWORD")
+        self.from_addr = os.getenv("SMTP_FROM", self.username)
+        self._server: Optional[smtplib.SMTP] = None
+
+    def __enter__(self) -> "SmtpSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _open(self) -> smtplib.SMTP:
+        if not self.host or not self.username or not self.password or not self.from_addr:
+            raise RuntimeError("Missing SMTP configuration env vars.")
+
+        server = smtplib.SMTP(self.host, self.port)
+        try:
+            server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def send(self, to: str, subject: str, body: str) -> None:
+        if self._server is None:
+            self._server = self._open()
+
+        msg = EmailMessage()
+        msg["From"] = self.from_addr
+        msg["To"] = to
+        msg["Subject"] = subject
+        msg.set_content(body or "")
+
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Server dropped an idle connection mid-batch; reconnect once.
+            self._server = self._open()
+            self._server.send_message(msg)
+
+    def close(self) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
 
 
 def send_email(to: str, subject: str, body: str) -> None:
-    host = os.getenv("SMTP_HOST")
-    port = int(os.getenv("SMTP_PORT", "587"))
-    username = os.getenv("SMTP_USERNAME")
-    password = os.getenv("SMTP_PASSWORD")
-    from_addr = os.getenv("SMTP_FROM", username)
-
-    if not host or not username or not password or not from_addr:
-        raise RuntimeError("Missing SMTP configuration env vars.")
-
-    msg = EmailMessage()
-    msg["From"] = from_addr
-    msg["To"] = to
-    msg["Subject"] = subject
-    msg.set_content(body or "")
-
-    with smtplib.SMTP(host, port) as server:
-        server.starttls()
-        server.login(username, password)
-        server.send_message(msg)
+    with SmtpSession() as smtp:
+        smtp.send(to, subject, body)
@@ -1,17 +1,47 @@
 import os
 import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 
 _DB_PATH = os.getenv("ALERTS_DB_PATH", "alerts.db")
 
+# One connection per thread, reused across calls. sqlite3 connections must
+# stay on the thread that opened them, and request handlers / the scheduler
+# each run on their own worker threads.
+_local = threading.local()
+
 
 def _connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(_DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(_DB_PATH, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        # WAL lets the scheduler's writes and request-thread reads proceed
+        # concurrently; NORMAL sync is durable enough under WAL and skips
+        # an fsync per commit.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
     return conn
 
 
+def _row_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    d = dict(row)
+    # Tickers repeat across every rule/state row; share one string per symbol.
+    if isinstance(d.get("ticker"), str):
+        d["ticker"] = sys.intern(d["ticker"])
+    return d
+
+
+def _rule_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    d = _row_dict(row)
+    d["enabled"] = bool(d["enabled"])
+    return d
+
+
 def init_db() -> None:
     with _connect() as conn:
         conn.execute(
@@ -35,6 +65,7 @@ def init_db() -> None:
                 last_regime TEXT,
                 last_trend_bucket TEXT,
                 last_decay TEXT,
+                last_decay_rank INTEGER NOT NULL DEFAULT -1,
                 last_sent_at TEXT,
                 created_at TEXT,
                 updated_at TEXT,
@@ -42,6 +73,26 @@ def init_db() -> None:
             )
             """
         )
+        # Older databases predate the integer decay rank column.
+        cols = {r["name"] for r in conn.execute("PRAGMA table_info(alert_state)")}
+        if "last_decay_rank" not in cols:
+            conn.execute(
+                "ALTER TABLE alert_state ADD COLUMN last_decay_rank INTEGER NOT NULL DEFAULT -1"
+            )
+        # One rule per (email, ticker) so upsert_rule can use ON CONFLICT.
+        # Older databases lacked the constraint: keep the oldest duplicate.
+        conn.execute(
+            """
+            DELETE FROM alert_rules
+            WHERE id NOT IN (SELECT MIN(id) FROM alert_rules GROUP BY email, ticker)
+            """
+        )
+        conn.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_alert_rules_email_ticker
+            ON alert_rules (email, ticker)
+            """
+        )
 
 
 def get_rules(enabled_only: bool = True) -> List[Dict[str, Any]]:
@@ -53,12 +104,7 @@ def get_rules(enabled_only: bool = True) -> List[Dict[str, Any]]:
 
     with _connect() as conn:
         rows = conn.execute(q, params).fetchall()
-        rules = []
-        for r in rows:
-            d = dict(r)
-            d["enabled"] = bool(d["enabled"])
-            rules.append(d)
-        return rules
+        return [_rule_dict(r) for r in rows]
 
 
 def get_rules_for_email(email: str) -> List[Dict[str, Any]]:
@@ -67,13 +113,7 @@ def get_rules_for_email(email: str) -> List[Dict[str, Any]]:
             "SELECT * FROM alert_rules WHERE email = ?",
             (email,),
         ).fetchall()
-
-        rules = []
-        for r in rows:
-            d = dict(r)
-            d["enabled"] = bool(d["enabled"])
-            rules.append(d)
-        return rules
+        return [_rule_dict(r) for r in rows]
 
 
 def delete_rule(email: str, ticker: str) -> None:
@@ -84,33 +124,30 @@ def delete_rule(email: str, ticker: str) -> None:
         )
 
 
-def upsert_rule(email: str, ticker: str, enabled: bool = True) -> None:
-    now = sqlite3.datetime.datetime.utcnow().isoformat() + "Z"
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def upsert_rule(
+    email: str,
+    ticker: str,
+    enabled: bool = True,
+    now_iso: Optional[str] = None,
+) -> None:
+    now = now_iso or _utc_now_iso()
     enabled_i = 1 if enabled else 0
 
     with _connect() as conn:
-        existing = conn.execute(
-            "SELECT id FROM alert_rules WHERE email = ? AND ticker = ?",
-            (email, ticker),
-        ).fetchone()
-
-        if existing:
-            conn.execute(
-                """
-                UPDATE alert_rules
-                SET enabled = ?, updated_at = ?
-                WHERE id = ?
-                """,
-                (enabled_i, now, existing["id"]),
-            )
-        else:
-            conn.execute(
-                """
-                INSERT INTO alert_rules (email, ticker, enabled, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (email, ticker, enabled_i, now, now),
-            )
+        conn.execute(
+            """
+            INSERT INTO alert_rules (email, ticker, enabled, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (email, ticker) DO UPDATE
+            SET enabled = excluded.enabled,
+                updated_at = excluded.updated_at
+            """,
+            (email, ticker, enabled_i, now, now),
+        )
 
 
 def get_state(email: str, ticker: str) -> Optional[Dict[str, Any]]:
@@ -119,7 +156,49 @@ def get_state(email: str, ticker: str) -> Optional[Dict[str, Any]]:
             "SELECT * FROM alert_state WHERE email = ? AND ticker = ?",
             (email, ticker),
         ).fetchone()
-        return dict(row) if row else None
+        return _row_dict(row) if row else None
+
+
+# Pairs per bulk query: 2 bound params each, under SQLite's 999-param floor.
+_BULK_CHUNK = 400
+
+
+def get_states_bulk(pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Fetch alert_state rows for many (email, ticker) pairs in one query per
+    chunk. Pairs with no stored state are simply absent from the result.
+    """
+    states: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    with _connect() as conn:
+        for i in range(0, len(pairs), _BULK_CHUNK):
+            chunk = pairs[i:i + _BULK_CHUNK]
+            values = ", ".join(["(?, ?)"] * len(chunk))
+            params = [p for pair in chunk for p in pair]
+            rows = conn.execute(
+                f"SELECT * FROM alert_state WHERE (email, ticker) IN (VALUES {values})",
+                params,
+            ).fetchall()
+            for r in rows:
+                d = _row_dict(r)
+                states[(d["email"], d["ticker"])] = d
+    return states
+
+
+# last_sent_at is only overwritten when a new value is supplied.
+_UPSERT_STATE_SQL = """
+    INSERT INTO alert_state
+        (email, ticker, last_regime, last_trend_bucket, last_decay,
+         last_decay_rank, last_sent_at, created_at, updated_at)
+    VALUES
+        (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (email, ticker) DO UPDATE
+    SET last_regime = excluded.last_regime,
+        last_trend_bucket = excluded.last_trend_bucket,
+        last_decay = excluded.last_decay,
+        last_decay_rank = excluded.last_decay_rank,
+        last_sent_at = COALESCE(excluded.last_sent_at, alert_state.last_sent_at),
+        updated_at = excluded.updated_at
+"""
 
 
 def upsert_state(
@@ -128,41 +207,57 @@ def upsert_state(
     last_regime: Optional[str] = None,
     last_trend_bucket: Optional[str] = None,
     last_decay: Optional[str] = None,
+    last_decay_rank: int = -1,
+    now_iso: Optional[str] = None,
 ) -> None:
-    now = sqlite3.datetime.datetime.utcnow().isoformat() + "Z"
+    now = now_iso or _utc_now_iso()
 
     with _connect() as conn:
-        existing = conn.execute(
-            "SELECT id FROM alert_state WHERE email = ? AND ticker = ?",
-            (email, ticker),
-        ).fetchone()
+        conn.execute(
+            _UPSERT_STATE_SQL,
+            (email, ticker, last_regime, last_trend_bucket, last_decay,
+             last_decay_rank, None, now, now),
+        )
 
-        if existing:
-            conn.execute(
-                """
-                UPDATE alert_state
-                SET last_regime = ?,
-                    last_trend_bucket = ?,
-                    last_decay = ?,
-                    updated_at = ?
-                WHERE id = ?
-                """,
-                (last_regime, last_trend_bucket, last_decay, now, existing["id"]),
-            )
-        else:
-            conn.execute(
-                """
-                INSERT INTO alert_state
-                    (email, ticker, last_regime, last_trend_bucket, last_decay, created_at, updated_at)
-                VALUES
-                    (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (email, ticker, last_regime, last_trend_bucket, last_decay, now, now),
-            )
 
+def upsert_states_bulk(rows: List[Dict[str, Any]], now_iso: Optional[str] = None) -> None:
+    """
+    Upsert many alert_state rows in a single transaction.
+
+    Each row takes the upsert_state keyword arguments, plus an optional
+    last_sent_at (left unchanged when missing or None).
+    """
+    if not rows:
+        return
+    now = now_iso or _utc_now_iso()
 
-def update_last_sent(email: str, ticker: str, last_sent_at: str) -> None:
-    now = sqlite3.datetime.datetime.utcnow().isoformat() + "Z"
+    with _connect() as conn:
+        conn.executemany(
+            _UPSERT_STATE_SQL,
+            [
+                (
+                    r["email"],
+                    r["ticker"],
+                    r.get("last_regime"),
+                    r.get("last_trend_bucket"),
+                    r.get("last_decay"),
+                    r.get("last_decay_rank", -1),
+                    r.get("last_sent_at"),
+                    now,
+                    now,
+                )
+                for r in rows
+            ],
+        )
+
+
+def update_last_sent(
+    email: str,
+    ticker: str,
+    last_sent_at: str,
+    now_iso: Optional[str] = None,
+) -> None:
+    now = now_iso or _utc_now_iso()
 
     with _connect() as conn:
         conn.execute(
@@ -1,22 +1,36 @@
 # services/alerts_service.py
 
 from collections import defaultdict
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict, List
 
 from services.analysis_service import analyze_ticker
 from services.alert_store import (
     get_rules,
-    get_state,
-    upsert_state,
-    update_last_sent,
+    get_states_bulk,
+    upsert_states_bulk,
 )
 
 # Hard cooldown: 6 hours
 COOLDOWN_SECONDS = 6 * 60 * 60
 
+# Upper bound on concurrent analyze_ticker calls during a scan
+ANALYZE_MAX_WORKERS = 16
+
 # Trend score buckets (stable + coarse)
 def _trend_bucket(score: Any) -> str:
+    try:
+        return _trend_bucket_cached(score)
+    except TypeError:
+        # Unhashable junk can't be memoized (and isn't a score anyway)
+        return "unknown"
+
+
+# Scores are ints in 0-100, so the memo stays small and hits after warmup.
+@lru_cache(maxsize=256)
+def _trend_bucket_cached(score: Any) -> str:
     try:
         s = float(score)
     except Exception:
@@ -32,13 +46,30 @@ def _trend_bucket(score: Any) -> str:
 DECAY_ORDER = {"None": 0, "Mild": 1, "Elevated": 2}
 
 
+def _decay_rank(decay: Any) -> int:
+    # -1 means "no decay signal"; unknown labels rank as "None".
+    return DECAY_ORDER.get(decay, 0) if decay else -1
+
+
+def _analyze_tickers(tickers) -> Dict[str, Dict[str, Any]]:
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    workers = min(ANALYZE_MAX_WORKERS, len(tickers))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(analyze_ticker, tickers)
+        return dict(zip(tickers, results))
+
+
 def run_alerts_once() -> List[Dict[str, Any]]:
     """
     Runs alert evaluation once.
     Returns a list of triggered alerts (delivery handled elsewhere).
     """
     triggered: List[Dict[str, Any]] = []
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
+    # One timestamp for every write in this scan
+    now_iso = now.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
     rules = get_rules(enabled_only=True)
 
@@ -47,8 +78,18 @@ def run_alerts_once() -> List[Dict[str, Any]]:
     for r in rules:
         grouped[(r["email"], r["ticker"])].append(r)
 
+    # One round-trip for every rule's stored state instead of one per rule.
+    states = get_states_bulk(list(grouped.keys()))
+
+    # Analyze each unique ticker once, in parallel; users watching the same
+    # ticker share the result.
+    analyses = _analyze_tickers({ticker for (_, ticker) in grouped})
+
+    # State writes are collected and flushed in one transaction at the end.
+    updates: List[Dict[str, Any]] = []
+
     for (email, ticker), _rules in grouped.items():
-        analysis = analyze_ticker(ticker)
+        analysis = analyses[ticker]
         signals = analysis.get("signals") or {}
 
         regime = signals.get("regime")
@@ -57,18 +98,21 @@ def run_alerts_once() -> List[Dict[str, Any]]:
         decay = signals.get("momentum_decay")
 
         bucket = _trend_bucket(trend_score)
-
-        state = get_state(email, ticker)
+        decay_rank = _decay_rank(decay)
+
+        state = states.get((email, ticker))
+        new_state = {
+            "email": email,
+            "ticker": ticker,
+            "last_regime": regime,
+            "last_trend_bucket": bucket,
+            "last_decay": decay,
+            "last_decay_rank": decay_rank,
+        }
 
         # First-time initialization: store state, do NOT alert
         if not state:
-            upsert_state(
-                email=email,
-                ticker=ticker,
-                last_regime=regime,
-                last_trend_bucket=bucket,
-                last_decay=decay,
-            )
+            updates.append(new_state)
             continue
 
         # Cooldown enforcement
@@ -76,6 +120,9 @@ def run_alerts_once() -> List[Dict[str, Any]]:
         if last_sent:
             try:
                 last_dt = datetime.fromisoformat(last_sent.replace("Z", ""))
+                if last_dt.tzinfo is None:
+                    # Stored as naive UTC with a trailing "Z"
+                    last_dt = last_dt.replace(tzinfo=timezone.utc)
                 if (now - last_dt).total_seconds() < COOLDOWN_SECONDS:
                     continue
             except Exception:
@@ -92,10 +139,12 @@ def run_alerts_once() -> List[Dict[str, Any]]:
             reasons.append(f"Trend strength changed to {bucket}")
 
         # 3) Decay worsened only
-        prev_decay = state.get("last_decay")
-        if decay and prev_decay:
-            if DECAY_ORDER.get(decay, 0) > DECAY_ORDER.get(prev_decay, 0):
-                reasons.append(f"Momentum decay worsened to {decay}")
+        prev_rank = state.get("last_decay_rank", -1)
+        if prev_rank < 0:
+            # Rows written before the rank column existed
+            prev_rank = _decay_rank(state.get("last_decay"))
+        if decay_rank >= 0 and prev_rank >= 0 and decay_rank > prev_rank:
+            reasons.append(f"Momentum decay worsened to {decay}")
 
         if reasons:
             triggered.append(
@@ -106,20 +155,11 @@ def run_alerts_once() -> List[Dict[str, Any]]:
                     "reasons": reasons,
                 }
             )
-
-            update_last_sent(
-                email=email,
-                ticker=ticker,
-                last_sent_at=now.isoformat() + "Z",
-            )
+            new_state["last_sent_at"] = now_iso
 
         # Always update stored state
-        upsert_state(
-            email=email,
-            ticker=ticker,
-            last_regime=regime,
-            last_trend_bucket=bucket,
-            last_decay=decay,
-        )
+        updates.append(new_state)
+
+    upsert_states_bulk(updates, now_iso=now_iso)
 
     return triggered
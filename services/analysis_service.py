@@ -16,8 +16,12 @@ It exposes a single main function:
 which the UI can call to get everything it needs in one shot.
 """
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 from logic.validation import validate_ticker
 from data.market_data_source import fetch_price_history
@@ -25,6 +29,23 @@ from data.company_info import fetch_company_profile, fetch_recent_news
 from logic.momentum import calculate_momentum_with_delta
 from services.ai_summary_service import generate_ai_summary
 
+logger = logging.getLogger(__name__)
+
+# Short-lived cache of successful analyses, keyed by normalized ticker.
+# Many users (and the alert scan) ask for the same tickers within seconds.
+# Bounded LRU so arbitrary ticker lookups can't grow it without limit.
+_TTL = 60
+_CACHE_MAXSIZE = 4096
+_CACHE: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    # Callers may tweak the top-level dict or its signals; keep the cached one intact.
+    out = dict(result)
+    out["signals"] = dict(result["signals"])
+    return out
+
 
 def analyze_ticker(ticker: str) -> Dict[str, Any]:
     """
@@ -32,12 +53,36 @@ def analyze_ticker(ticker: str) -> Dict[str, Any]:
 
     Returns a clean, stable result object that the UI can display.
     Always returns the same shape, with missing data as explicit nulls.
+    Successful results are reused for up to _TTL seconds.
     """
     # Basic normalization: strip spaces and uppercase the ticker
     raw_ticker = (ticker or "").strip().upper()
 
+    now = time.monotonic()
+    with _CACHE_LOCK:
+        hit = _CACHE.get(raw_ticker)
+        if hit:
+            _CACHE.move_to_end(raw_ticker)
+    if hit and now - hit[0] < _TTL:
+        return _copy_result(hit[1])
+
+    result = _analyze_uncached(raw_ticker)
+
+    # Only cache complete analyses; errors and degraded results (AI summary or
+    # company/news step failed) should be retried on the next call.
+    if result["ok"] and not result["error"]:
+        with _CACHE_LOCK:
+            _CACHE[raw_ticker] = (now, result)
+            _CACHE.move_to_end(raw_ticker)
+            while len(_CACHE) > _CACHE_MAXSIZE:
+                _CACHE.popitem(last=False)
+        return _copy_result(result)
+    return result
+
+
+def _analyze_uncached(raw_ticker: str) -> Dict[str, Any]:
     def _utc_iso_z() -> str:
-        return datetime.utcnow().isoformat() + "Z"
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
     # ✅ Stable MVP schema (single contract)
     result: Dict[str, Any] = {
@@ -93,7 +138,7 @@ def analyze_ticker(ticker: str) -> Dict[str, Any]:
         result["signals"]["momentum_decay"] = decay
 
     except Exception as e:
-        print(f"[analysis_service] Error in price/momentum step: {e}")
+        logger.warning("Error in price/momentum step for %s: %s", cleaned_ticker, e)
         result["error"] = "We couldn't load recent price data for this ticker right now."
         result["as_of"] = _utc_iso_z()
         return result
@@ -113,7 +158,7 @@ def analyze_ticker(ticker: str) -> Dict[str, Any]:
         result["news"] = news_items                 # keep if your UI still uses it
 
     except Exception as e:
-        print(f"[analysis_service] Error in company/news step: {e}")
+        logger.warning("Error in company/news step for %s: %s", cleaned_ticker, e)
         # Keep these explicit + safe defaults
         result["company_name"] = result.get("company_name") or None
         result["company_profile"] = result.get("company_profile") or {}
@@ -133,7 +178,7 @@ def analyze_ticker(ticker: str) -> Dict[str, Any]:
         )
         result["summary"] = summary
     except Exception as e:
-        print(f"[analysis_service] Error in AI summary step: {e}")
+        logger.warning("Error in AI summary step for %s: %s", cleaned_ticker, e)
         if not result["error"]:
             result["error"] = (
                 "We had trouble generating the AI explanation. "
@@ -3,40 +3,110 @@ from __future__ import annotations
 
 import json
 import os
-from datetime import datetime
-from typing import Dict, List
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
 
-WAITLIST_PATH = os.getenv("WAITLIST_PATH", "data/waitlist.json")
+# One JSON object per line; signups append a line instead of rewriting the file.
+WAITLIST_PATH = os.getenv("WAITLIST_PATH", "data/waitlist.jsonl")
 
+# Pre-JSONL deployments stored a single JSON array next to it.
+_LEGACY_PATH = os.path.splitext(WAITLIST_PATH)[0] + ".json"
+
+_SEEN: Optional[Set[str]] = None
+_LOCK = threading.Lock()
+
+
+def _read_array(path: str) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else []
 
-def _load() -> List[Dict[str, str]]:
-    if not os.path.exists(WAITLIST_PATH):
-        return []
-    try:
-        with open(WAITLIST_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data if isinstance(data, list) else []
-    except Exception:
-        return []
 
+def _is_json_array(path: str) -> bool:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            stripped = line.lstrip()
+            if stripped:
+                return stripped.startswith("[")
+    return False
 
-def _save(rows: List[Dict[str, str]]) -> None:
+
+def _write_jsonl(rows: List[Dict[str, str]]) -> Set[str]:
+    """Replace WAITLIST_PATH with rows as JSONL (deduped); returns the emails."""
+    seen: Set[str] = set()
     os.makedirs(os.path.dirname(WAITLIST_PATH) or ".", exist_ok=True)
-    with open(WAITLIST_PATH, "w", encoding="utf-8") as f:
-        json.dump(rows, f, indent=2)
+    tmp = WAITLIST_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for r in rows:
+            email = r.get("email") if isinstance(r, dict) else None
+            if email and email not in seen:
+                seen.add(email)
+                f.write(json.dumps(r) + "\n")
+    os.replace(tmp, WAITLIST_PATH)
+    return seen
+
+
+def _load_seen() -> Set[str]:
+    if not os.path.exists(WAITLIST_PATH):
+        # First run after the JSONL switch: carry the old array over once.
+        if _LEGACY_PATH != WAITLIST_PATH and os.path.exists(_LEGACY_PATH):
+            return _write_jsonl(_read_array(_LEGACY_PATH))
+        return set()
+
+    if _is_json_array(WAITLIST_PATH):
+        # WAITLIST_PATH still points at a pre-JSONL array file: convert it in
+        # place. A parse error propagates rather than appending to (and
+        # corrupting) a file we can't read.
+        return _write_jsonl(_read_array(WAITLIST_PATH))
+
+    with open(WAITLIST_PATH, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            # A crash mid-append left an unterminated last line. Terminate it
+            # if it is a whole row, otherwise cut it, so the next signup
+            # starts on its own line instead of being glued onto it.
+            cut = data.rfind(b"\n") + 1
+            try:
+                json.loads(data[cut:])
+                f.write(b"\n")
+            except ValueError:
+                f.truncate(cut)
+                data = data[:cut]
+
+    seen: Set[str] = set()
+    for line in data.decode("utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            # Garbage left by older builds that appended after a torn line.
+            continue
+        if isinstance(row, dict) and row.get("email"):
+            seen.add(row["email"])
+    return seen
 
 
 def save_waitlist_email(email: str) -> None:
     """
     Save/append a waitlist email (deduped).
     """
+    global _SEEN
+
     email = (email or "").strip().lower()
     if not email:
         return
 
-    rows = _load()
-    if any(r.get("email") == email for r in rows):
-        return
+    with _LOCK:
+        if _SEEN is None:
+            _SEEN = _load_seen()
+        if email in _SEEN:
+            return
 
-    rows.append({"email": email, "created_at": datetime.utcnow().isoformat() + "Z"})
-    _save(rows)
+        row = {"email": email, "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")}
+        os.makedirs(os.path.dirname(WAITLIST_PATH) or ".", exist_ok=True)
+        with open(WAITLIST_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row) + "\n")
+        _SEEN.add(email)
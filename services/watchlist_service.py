@@ -7,18 +7,38 @@ Stores watchlists in a JSON file on disk.
 Can later be swapped for a database with no API changes.
 """
 
+import atexit
 import json
-from datetime import datetime
+import logging
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
+from billing.feature_flags import is_premium
+from config import WATCHLIST_RESTAT_SECONDS
 from services.analysis_service import analyze_ticker
 
+logger = logging.getLogger(__name__)
+
+# orjson parses/serializes several times faster and works in bytes directly;
+# the stdlib is a drop-in fallback.
+try:
+    import orjson  # type: ignore
+except ModuleNotFoundError:
+    orjson = None  # type: ignore
+
+# Advisory cross-process lock around flushes; not available on Windows.
 try:
-    from billing.feature_flags import is_premium
+    import fcntl  # type: ignore
 except ImportError:
-    def is_premium(user_id: str) -> bool:  # type: ignore
-        return False
+    fcntl = None  # type: ignore
 
 
 # --------------------------------------------------
@@ -26,23 +46,222 @@ except ImportError:
 # --------------------------------------------------
 
 WATCHLIST_FILE = Path("data/watchlists.json")
+LOCK_FILE = WATCHLIST_FILE.with_suffix(".lock")
+
+
+# Last parsed file contents, keyed by (st_mtime_ns, st_size). Unchanged files
+# are served from here instead of being reopened and re-parsed per request.
+_CACHE: Dict[str, Any] = {"sig": None, "data": None}
+
+
+def _file_sig() -> Optional[Tuple[int, int]]:
+    try:
+        st = WATCHLIST_FILE.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _copy(data: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    # Callers mutate the lists they get back; never hand out the cached ones.
+    return {k: list(v) if isinstance(v, list) else v for k, v in data.items()}
+
+
+def _read_json() -> Any:
+    if not orjson:
+        return json.loads(WATCHLIST_FILE.read_bytes())
+    # Parse straight out of the page cache instead of copying the file into a
+    # bytes object first. mmap refuses empty files; those aren't valid JSON.
+    with open(WATCHLIST_FILE, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("empty watchlist file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
 
 
 def _load_all() -> Dict[str, List[str]]:
-    if not WATCHLIST_FILE.exists():
+    sig = _file_sig()
+    if sig is None:
         return {}
+    if sig == _CACHE["sig"]:
+        return _copy(_CACHE["data"])
     try:
-        with open(WATCHLIST_FILE, "r") as f:
-            data = json.load(f)
-            return data if isinstance(data, dict) else {}
+        data = _read_json()
+        data = data if isinstance(data, dict) else {}
     except Exception:
         return {}
+    _CACHE["sig"], _CACHE["data"] = sig, data
+    return _copy(data)
 
 
 def _save_all(data: Dict[str, List[str]]) -> None:
     WATCHLIST_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(WATCHLIST_FILE, "w") as f:
-        json.dump(data, f)
+    # Serialize up front and hand the OS one buffer: json.dump to a file
+    # issues a write per fragment. Then swap the temp file in, so readers
+    # never see a torn file.
+    if orjson:
+        payload = orjson.dumps(data)
+    else:
+        payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    tmp = WATCHLIST_FILE.with_suffix(".json.tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, WATCHLIST_FILE)
+    # Prime the cache so the next read doesn't re-parse what we just wrote.
+    _CACHE["sig"], _CACHE["data"] = _file_sig(), _copy(data)
+
+
+# In-memory watchlists are the source of truth; mutations land here at once
+# and reach disk via a debounced flush, so a burst of adds/removes costs a
+# single file rewrite.
+FLUSH_DELAY_SECONDS = 0.2
+# Failed flushes retry with exponential backoff, capped here.
+FLUSH_RETRY_MAX_SECONDS = 30.0
+
+# How outside edits to the file are noticed: 0 re-stats it on every access;
+# N > 0 moves that to a background thread that checks every N seconds.
+RESTAT_SECONDS = WATCHLIST_RESTAT_SECONDS
+
+_STATE: Optional[Dict[str, List[str]]] = None
+# Per-user membership sets mirroring _STATE, built lazily; lists keep order.
+_MEMBERS: Dict[str, Set[str]] = {}
+_LOCK = threading.RLock()
+_dirty = False
+# Mutations not yet on disk, replayed if another process rewrote the file.
+_pending_ops: List[Tuple[str, str, str]] = []
+_flush_timer: Optional[threading.Timer] = None
+_flush_failures = 0
+
+
+def _state() -> Dict[str, List[str]]:
+    """Current watchlists. Call with _LOCK held."""
+    global _STATE
+    # Pick up edits made to the file by someone else, unless ours are pending.
+    stale = not RESTAT_SECONDS and not _dirty and _file_sig() != _CACHE["sig"]
+    if _STATE is None or stale:
+        _STATE = _load_all()
+        _MEMBERS.clear()
+        if _normalize_all(_STATE):
+            # Legacy file with un-normalized tickers: persist the cleanup once.
+            _mark_dirty()
+    return _STATE
+
+
+def _members(user_id: str) -> Set[str]:
+    """Membership set for user_id's list. Call with _LOCK held, after _state()."""
+    members = _MEMBERS.get(user_id)
+    if members is None:
+        members = _MEMBERS[user_id] = set(_STATE.get(user_id) or [])
+    return members
+
+
+def _normalize_all(data: Dict[str, List[str]]) -> bool:
+    """Normalize stored tickers in place. Returns True if anything changed."""
+    changed = False
+    for user_id, tickers in data.items():
+        if not isinstance(tickers, list):
+            continue
+        normalized = [_normalize_ticker(t) if isinstance(t, str) else t for t in tickers]
+        if normalized != tickers:
+            data[user_id] = normalized
+            changed = True
+    return changed
+
+
+def _record(op: str, user_id: str, ticker: str) -> None:
+    """Note an add/remove for the next flush. Call with _LOCK held."""
+    _pending_ops.append((op, user_id, ticker))
+    _mark_dirty()
+
+
+def _replay(data: Dict[str, List[str]]) -> None:
+    for op, user_id, ticker in _pending_ops:
+        watchlist = data.setdefault(user_id, [])
+        if op == "add" and ticker not in watchlist:
+            # Another worker may have filled the list since we admitted this
+            # add; the limit applies to the merged result.
+            premium = _user_is_premium(user_id)
+            limit = PREMIUM_WATCHLIST_LIMIT if premium else FREE_WATCHLIST_LIMIT
+            if len(watchlist) >= limit:
+                logger.warning(
+                    "Dropping watchlist add %s for %s: limit %d reached on merge",
+                    ticker, user_id, limit,
+                )
+                continue
+            watchlist.append(ticker)
+        elif op == "remove" and ticker in watchlist:
+            watchlist.remove(ticker)
+
+
+@contextmanager
+def _file_lock():
+    if fcntl is None:
+        yield
+        return
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _mark_dirty(delay: float = FLUSH_DELAY_SECONDS) -> None:
+    """Schedule a flush of _STATE. Call with _LOCK held."""
+    global _dirty, _flush_timer
+    _dirty = True
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(delay, _flush_now)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+def _flush_now() -> None:
+    global _STATE, _dirty, _flush_timer, _flush_failures
+    with _LOCK:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        if not _dirty or _STATE is None:
+            return
+        try:
+            # Other workers flush the same file. Under the lock, if someone
+            # wrote since we loaded, apply our pending ops on top of their
+            # version instead of overwriting it.
+            with _file_lock():
+                if _file_sig() != _CACHE["sig"]:
+                    fresh = _load_all()
+                    _normalize_all(fresh)
+                    _replay(fresh)
+                    _STATE = fresh
+                    _MEMBERS.clear()
+                _save_all(_STATE)
+            _dirty = False
+            _pending_ops.clear()
+            _flush_failures = 0
+        except Exception as e:
+            # Keep the pending changes and try again later; otherwise they'd
+            # sit in memory until the next mutation or process exit.
+            _flush_failures += 1
+            delay = min(FLUSH_DELAY_SECONDS * 2 ** _flush_failures, FLUSH_RETRY_MAX_SECONDS)
+            logger.warning("Failed to write watchlists (retrying in %.1fs): %s", delay, e)
+            _mark_dirty(delay)
+
+
+atexit.register(_flush_now)
+
+
+def _watch_file() -> None:
+    global _STATE
+    while True:
+        time.sleep(RESTAT_SECONDS)
+        with _LOCK:
+            if not _dirty and _file_sig() != _CACHE["sig"]:
+                _STATE = None  # reloaded by the next _state() call
 
 
 # --------------------------------------------------
@@ -52,6 +271,9 @@ def _save_all(data: Dict[str, List[str]]) -> None:
 FREE_WATCHLIST_LIMIT = 3
 PREMIUM_WATCHLIST_LIMIT = 50
 
+# Upper bound on concurrent analyze_ticker calls per watchlist
+ANALYZE_MAX_WORKERS = 16
+
 
 class ProRequiredError(Exception):
     code = "PRO_REQUIRED"
@@ -65,26 +287,48 @@ def _normalize_ticker(ticker: str) -> str:
     return (ticker or "").strip().upper()
 
 
-def _get_limit_for_user(user_id: str) -> int:
-    return PREMIUM_WATCHLIST_LIMIT if is_premium(user_id) else FREE_WATCHLIST_LIMIT
+# is_premium will eventually hit billing; look each user up at most once a minute.
+PREMIUM_CACHE_SECONDS = 60
 
 
-def _utc_iso_z() -> str:
-    return datetime.utcnow().isoformat() + "Z"
+@lru_cache(maxsize=4096)
+def _is_premium_cached(user_id: str, bucket: int) -> bool:
+    return is_premium(user_id)
+
 
+def _user_is_premium(user_id: str) -> bool:
+    return _is_premium_cached(user_id, int(time.time() // PREMIUM_CACHE_SECONDS))
 
-def _analysis_fallback(ticker: str, error_msg: str) -> Dict[str, Any]:
-    t = _normalize_ticker(ticker)
-    return {
-        "ok": False,
-        "ticker": t,
-        "as_of": _utc_iso_z(),
-        "company_name": None,
-        "momentum": None,
-        "signals": {"momentum_decay": None},
-        "summary": "",
-        "error": error_msg,
-    }
+
+def _utc_iso_z() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+# Shape of a failed analysis; copied per use and filled in.
+_FALLBACK_TEMPLATE: Dict[str, Any] = {
+    "ok": False,
+    "ticker": None,
+    "as_of": None,
+    "company_name": None,
+    "momentum": None,
+    "signals": None,  # fresh dict per copy, see below
+    "summary": "",
+    "error": None,
+}
+
+
+def _analysis_fallback(
+    ticker: str,
+    error_msg: str,
+    as_of: Optional[str] = None,
+) -> Dict[str, Any]:
+    d = _FALLBACK_TEMPLATE.copy()
+    d["ticker"] = _normalize_ticker(ticker)
+    d["as_of"] = as_of or _utc_iso_z()
+    # Not shared with the template: callers may fill in signals.
+    d["signals"] = {"momentum_decay": None}
+    d["error"] = error_msg
+    return d
 
 
 # --------------------------------------------------
@@ -97,59 +341,120 @@ def add_to_watchlist(user_id: str, ticker: str) -> List[str]:
     if not ticker:
         raise ValueError("Ticker cannot be empty.")
 
-    data = _load_all()
-    watchlist = data.setdefault(user_id, [])
-
-    watchlist = [_normalize_ticker(t) for t in watchlist]
-    data[user_id] = watchlist
-
-    if ticker in watchlist:
+    with _LOCK:
+        data = _state()
+        # Stored tickers are already normalized (on write, and on load for
+        # legacy files), so no per-call clean-up pass here.
+        members = _members(user_id)
+
+        # Idempotent re-add (client retries): answer from memory, touch nothing.
+        if ticker in members:
+            return list(data[user_id])
+
+        watchlist = data.setdefault(user_id, [])
+
+        premium = _user_is_premium(user_id)
+        limit = PREMIUM_WATCHLIST_LIMIT if premium else FREE_WATCHLIST_LIMIT
+        if len(watchlist) >= limit:
+            if not premium:
+                raise ProRequiredError(
+                    "Pro required to add more than 3 tickers to your watchlist."
+                )
+            raise ValueError(f"Watchlist limit reached (max {limit}).")
+
+        watchlist.append(ticker)
+        members.add(ticker)
+        _record("add", user_id, ticker)
         return list(watchlist)
 
-    limit = _get_limit_for_user(user_id)
-    if len(watchlist) >= limit:
-        if not is_premium(user_id):
-            raise ProRequiredError(
-                "Pro required to add more than 3 tickers to your watchlist."
-            )
-        raise ValueError(f"Watchlist limit reached (max {limit}).")
-
-    watchlist.append(ticker)
-    _save_all(data)
-    return list(watchlist)
-
 
 def remove_from_watchlist(user_id: str, ticker: str) -> List[str]:
     user_id = str(user_id)
     ticker = _normalize_ticker(ticker)
 
-    data = _load_all()
-    watchlist = data.get(user_id, [])
+    with _LOCK:
+        data = _state()
+        watchlist = data.get(user_id, [])
+        members = _members(user_id)
 
-    if ticker in watchlist:
-        watchlist.remove(ticker)
-        _save_all(data)
+        if ticker in members:
+            watchlist.remove(ticker)
+            if ticker not in watchlist:  # legacy lists may hold duplicates
+                members.discard(ticker)
+            _record("remove", user_id, ticker)
 
-    return list(watchlist)
+        return list(watchlist)
 
 
 def get_watchlist(user_id: str) -> List[str]:
     user_id = str(user_id)
-    data = _load_all()
-    return list(data.get(user_id, []))
+    with _LOCK:
+        data = _state()
+        return list(data.get(user_id, []))
 
 
 def get_watchlist_with_analysis(user_id: str) -> List[Dict[str, Any]]:
     tickers = get_watchlist(user_id)
     results: List[Dict[str, Any]] = []
-
-    for ticker in tickers:
-        try:
-            results.append(analyze_ticker(ticker))
-        except Exception as e:
-            print(f"[watchlist_service] Error analyzing {ticker}: {e}")
-            results.append(_analysis_fallback(ticker, "Failed to analyze ticker."))
+    if not tickers:
+        return results
+
+    # Each analysis is independent network I/O; run them side by side and
+    # collect in watchlist order.
+    workers = min(ANALYZE_MAX_WORKERS, len(tickers))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_ticker, t) for t in tickers]
+
+        # Failures in one batch share a timestamp, stamped on the first one.
+        as_of: Optional[str] = None
+        for ticker, future in zip(tickers, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.warning("Error analyzing %s: %s", ticker, e)
+                as_of = as_of or _utc_iso_z()
+                results.append(
+                    _analysis_fallback(ticker, "Failed to analyze ticker.", as_of)
+                )
 
     return results
 
 
+def stream_watchlist_analyses(user_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield each watchlist analysis as soon as it finishes (completion order,
+    not watchlist order), so a streaming response can send the fast tickers
+    without waiting on the slowest one.
+    """
+    tickers = get_watchlist(user_id)
+    if not tickers:
+        return
+
+    workers = min(ANALYZE_MAX_WORKERS, len(tickers))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {pool.submit(analyze_ticker, t): t for t in tickers}
+        as_of: Optional[str] = None
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                logger.warning("Error analyzing %s: %s", ticker, e)
+                as_of = as_of or _utc_iso_z()
+                yield _analysis_fallback(ticker, "Failed to analyze ticker.", as_of)
+    finally:
+        # Client went away mid-stream: drop whatever hasn't started yet.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Warm the in-memory store at import (already a synchronous startup cost) so
+# the first request doesn't pay for parsing the file.
+try:
+    with _LOCK:
+        _state()
+except Exception as e:
+    logger.warning("Failed to preload watchlists: %s", e)
+
+if RESTAT_SECONDS > 0:
+    threading.Thread(target=_watch_file, name="watchlist-restat", daemon=True).start()
@@ -0,0 +1,97 @@
+# test/test_alert_store.py
+
+"""
+Tests for services/alert_store.py
+
+Runs against a throwaway SQLite file per test (the store reads its path
+from _DB_PATH and caches one connection per thread, so both are reset).
+"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+import services.alert_store as store
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "alerts.db"
+    monkeypatch.setattr(store, "_DB_PATH", str(path))
+    monkeypatch.setattr(store, "_local", threading.local())
+    store.init_db()
+    yield path
+    conn = getattr(store._local, "conn", None)
+    if conn is not None:
+        conn.close()
+
+
+def test_get_states_bulk_across_chunks(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(store, "_BULK_CHUNK", 3)
+    for i in range(10):
+        store.upsert_state(f"u{i}@x.co", "AAPL", last_regime=f"r{i}")
+
+    pairs = [(f"u{i}@x.co", "AAPL") for i in range(12)]  # u10, u11 have no state
+    states = store.get_states_bulk(pairs)
+
+    assert set(states) == set(pairs[:10])
+    assert states[("u7@x.co", "AAPL")]["last_regime"] == "r7"
+
+
+def test_get_states_bulk_matches_pairs_not_cross_product():
+    store.upsert_state("a@x.co", "AAPL")
+    store.upsert_state("b@x.co", "MSFT")
+
+    states = store.get_states_bulk([("a@x.co", "MSFT"), ("b@x.co", "MSFT")])
+
+    assert list(states) == [("b@x.co", "MSFT")]
+
+
+def test_get_states_bulk_empty():
+    assert store.get_states_bulk([]) == {}
+
+
+def _state(email: str, ticker: str):
+    return store.get_states_bulk([(email, ticker)])[(email, ticker)]
+
+
+def test_upsert_states_bulk_inserts_and_updates():
+    store.upsert_states_bulk(
+        [
+            {"email": "a@x.co", "ticker": "AAPL", "last_regime": "Uptrend",
+             "last_trend_bucket": "strong", "last_decay": "None", "last_decay_rank": 0},
+            {"email": "b@x.co", "ticker": "AAPL", "last_regime": "Sideways"},
+        ],
+        now_iso="2025-01-01T00:00:00Z",
+    )
+    store.upsert_states_bulk(
+        [{"email": "a@x.co", "ticker": "AAPL", "last_regime": "Downtrend",
+          "last_trend_bucket": "weak", "last_decay": "Mild", "last_decay_rank": 1}],
+        now_iso="2025-01-02T00:00:00Z",
+    )
+
+    a = _state("a@x.co", "AAPL")
+    assert (a["last_regime"], a["last_trend_bucket"], a["last_decay_rank"]) == ("Downtrend", "weak", 1)
+    assert a["created_at"] == "2025-01-01T00:00:00Z"
+    assert a["updated_at"] == "2025-01-02T00:00:00Z"
+    assert _state("b@x.co", "AAPL")["last_decay_rank"] == -1
+
+
+def test_upsert_states_bulk_keeps_last_sent_at_unless_given():
+    row = {"email": "a@x.co", "ticker": "AAPL", "last_regime": "Uptrend"}
+    store.upsert_states_bulk([dict(row, last_sent_at="2025-01-01T00:00:00Z")])
+
+    # No last_sent_at (or None): the stored value survives
+    store.upsert_states_bulk([row])
+    store.upsert_states_bulk([dict(row, last_sent_at=None)])
+    store.upsert_state("a@x.co", "AAPL", last_regime="Sideways")
+    assert _state("a@x.co", "AAPL")["last_sent_at"] == "2025-01-01T00:00:00Z"
+
+    store.upsert_states_bulk([dict(row, last_sent_at="2025-02-01T00:00:00Z")])
+    assert _state("a@x.co", "AAPL")["last_sent_at"] == "2025-02-01T00:00:00Z"
+
+
+def test_upsert_states_bulk_empty_is_noop():
+    store.upsert_states_bulk([])
+    assert store.get_states_bulk([("a@x.co", "AAPL")]) == {}
@@ -0,0 +1,67 @@
+# test/test_alerts_service.py
+
+"""
+Tests for services/alerts_service.py
+
+run_alerts_once() is driven with a stubbed analyze_ticker against a
+throwaway alerts database.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+import services.alert_store as store
+import services.alerts_service as alerts_service
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(store, "_DB_PATH", str(tmp_path / "alerts.db"))
+    monkeypatch.setattr(store, "_local", threading.local())
+    store.init_db()
+    store.upsert_rule("a@x.co", "AAPL")
+
+
+def _analysis(regime: str, score: int) -> Dict[str, Any]:
+    return {"signals": {"regime": regime, "trend_score": score, "momentum_decay": "None"}}
+
+
+def _set_last_sent(value: str) -> None:
+    conn = store._connect()
+    with conn:
+        conn.execute("UPDATE alert_state SET last_sent_at = ?", (value,))
+
+
+def test_first_scan_initializes_then_alerts_on_change(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(alerts_service, "analyze_ticker", lambda t: _analysis("Uptrend", 80))
+    assert alerts_service.run_alerts_once() == []
+
+    monkeypatch.setattr(alerts_service, "analyze_ticker", lambda t: _analysis("Downtrend", 30))
+    triggered = alerts_service.run_alerts_once()
+
+    assert [(t["email"], t["ticker"]) for t in triggered] == [("a@x.co", "AAPL")]
+    last_sent = store.get_state("a@x.co", "AAPL")["last_sent_at"]
+    assert last_sent.endswith("Z") and "+00:00" not in last_sent
+
+
+@pytest.mark.parametrize(
+    "fmt",
+    [
+        lambda dt: dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        lambda dt: dt.replace(tzinfo=None).isoformat() + "Z",  # older rows
+    ],
+)
+def test_cooldown_is_enforced(monkeypatch: pytest.MonkeyPatch, fmt):
+    monkeypatch.setattr(alerts_service, "analyze_ticker", lambda t: _analysis("Uptrend", 80))
+    alerts_service.run_alerts_once()
+
+    _set_last_sent(fmt(datetime.now(timezone.utc) - timedelta(hours=1)))
+    monkeypatch.setattr(alerts_service, "analyze_ticker", lambda t: _analysis("Downtrend", 30))
+    assert alerts_service.run_alerts_once() == []
+
+    _set_last_sent(fmt(datetime.now(timezone.utc) - timedelta(hours=7)))
+    assert len(alerts_service.run_alerts_once()) == 1
@@ -0,0 +1,74 @@
+# test/test_analysis_cache.py
+
+"""
+Tests for the short-lived result cache in services/analysis_service.py
+
+analyze_ticker() reuses complete analyses for _TTL seconds. Dependencies are
+stubbed and the module clock is replaced so TTL expiry needs no sleeping.
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+import services.analysis_service as analysis_service
+
+
+@pytest.fixture
+def stubs(monkeypatch: pytest.MonkeyPatch) -> Dict[str, Any]:
+    state: Dict[str, Any] = {"clock": 1000.0, "summary_calls": 0, "ai_fails": False}
+
+    def fake_generate_ai_summary(ticker, company_profile, news, momentum) -> str:
+        state["summary_calls"] += 1
+        if state["ai_fails"]:
+            raise RuntimeError("503 from AI provider")
+        return "summary"
+
+    def fake_news(ticker: str) -> List[Dict[str, Any]]:
+        return []
+
+    monkeypatch.setattr(analysis_service, "_CACHE", analysis_service.OrderedDict())
+    monkeypatch.setattr(analysis_service, "time", SimpleNamespace(monotonic=lambda: state["clock"]))
+    monkeypatch.setattr(analysis_service, "validate_ticker", lambda t: t)
+    monkeypatch.setattr(analysis_service, "fetch_price_history", lambda t: [1.0] * 5)
+    monkeypatch.setattr(
+        analysis_service,
+        "calculate_momentum_with_delta",
+        lambda h: {"label": "Uptrend", "score": 80, "delta_since_close": 1, "regime": "Uptrend"},
+    )
+    monkeypatch.setattr(analysis_service, "fetch_company_profile", lambda t: {"name": "Test Corp"})
+    monkeypatch.setattr(analysis_service, "fetch_recent_news", fake_news)
+    monkeypatch.setattr(analysis_service, "generate_ai_summary", fake_generate_ai_summary)
+    return state
+
+
+def test_complete_result_is_cached_until_ttl(stubs: Dict[str, Any]):
+    first = analysis_service.analyze_ticker("aapl")
+    assert first["ok"] and first["error"] is None
+
+    # Callers mutating their copy must not leak into the cache
+    first["signals"]["regime"] = "tampered"
+
+    stubs["clock"] += analysis_service._TTL - 1
+    hit = analysis_service.analyze_ticker(" AAPL ")
+    assert stubs["summary_calls"] == 1
+    assert hit["signals"]["regime"] == "Uptrend"
+
+    stubs["clock"] += 2
+    analysis_service.analyze_ticker("AAPL")
+    assert stubs["summary_calls"] == 2
+
+
+def test_degraded_result_is_not_cached(stubs: Dict[str, Any]):
+    stubs["ai_fails"] = True
+    degraded = analysis_service.analyze_ticker("AAPL")
+    assert degraded["ok"] and degraded["error"]
+
+    # The AI provider recovers: the very next call retries instead of
+    # serving the degraded result for the rest of the TTL.
+    stubs["ai_fails"] = False
+    result = analysis_service.analyze_ticker("AAPL")
+
+    assert stubs["summary_calls"] == 2
+    assert result["error"] is None and result["summary"] == "summary"
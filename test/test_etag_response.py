@@ -0,0 +1,63 @@
+# test/test_etag_response.py
+
+"""
+Tests for app._etag_response
+
+Polling endpoints return a content-hash ETag and answer a matching
+If-None-Match with an empty 304.
+"""
+
+from typing import Any, Optional
+
+import pytest
+from starlette.requests import Request
+
+import app as app_module
+
+PAYLOAD = {"ok": True, "rules": [{"ticker": "AAPL", "enabled": True}]}
+
+
+def _request(if_none_match: Optional[str] = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def _etag(payload: Any = PAYLOAD) -> str:
+    return app_module._etag_response(_request(), payload).headers["etag"]
+
+
+def test_full_response_carries_etag():
+    resp = app_module._etag_response(_request(), PAYLOAD)
+
+    assert resp.status_code == 200
+    assert resp.body == b'{"ok":true,"rules":[{"ticker":"AAPL","enabled":true}]}'
+    assert resp.headers["etag"].startswith('"')
+    assert resp.headers["cache-control"] == "private, no-cache"
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "{etag}",
+        "W/{etag}",  # weak form, e.g. after a proxy recompressed the body
+        '"other", {etag}',
+        '"other",W/{etag}',
+    ],
+)
+def test_matching_if_none_match_is_304(header: str):
+    etag = _etag()
+    resp = app_module._etag_response(_request(header.format(etag=etag)), PAYLOAD)
+
+    assert resp.status_code == 304
+    assert resp.body == b""
+    assert resp.headers["etag"] == etag
+
+
+def test_changed_payload_gets_new_etag():
+    stale = _etag()
+    resp = app_module._etag_response(_request(stale), {"ok": True, "rules": []})
+
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != stale
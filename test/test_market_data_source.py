@@ -0,0 +1,108 @@
+# test/test_market_data_source.py
+
+"""
+Tests for the price-history cache in data/market_data_source.py
+
+_fetch_from_provider is stubbed, so these cover the cache policy only:
+fresh hits, stale-while-revalidate, and single-flight on concurrent misses.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+import data.market_data_source as mds
+
+PRICES = [{"close": 1.0, "volume": 10.0}]
+
+
+@pytest.fixture
+def provider(monkeypatch: pytest.MonkeyPatch) -> Dict[str, Any]:
+    state: Dict[str, Any] = {"calls": [], "gate": None, "done": threading.Event()}
+
+    def fake_fetch(t: str) -> List[Dict[str, float]]:
+        state["calls"].append(t)
+        if state["gate"] is not None:
+            state["gate"].wait(5)
+        state["done"].set()
+        return PRICES
+
+    monkeypatch.setattr(mds, "_PRICE_CACHE", {})
+    monkeypatch.setattr(mds, "_REFRESHING", set())
+    monkeypatch.setattr(mds, "_FETCH_LOCKS", {})
+    monkeypatch.setattr(mds, "_fetch_from_provider", fake_fetch)
+    return state
+
+
+def _wait_for_refresh() -> None:
+    deadline = time.time() + 5
+    while mds._REFRESHING and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_fresh_hit_skips_provider(provider: Dict[str, Any]):
+    mds._PRICE_CACHE["AAPL"] = (time.time(), PRICES)
+
+    assert mds.fetch_price_history(" aapl ") is PRICES
+    assert provider["calls"] == []
+
+
+def test_stale_hit_returns_cached_and_refreshes_once(provider: Dict[str, Any]):
+    old = [{"close": 0.5, "volume": 1.0}]
+    stale_ts = time.time() - mds._CACHE_TTL_SECONDS - 1
+    mds._PRICE_CACHE["AAPL"] = (stale_ts, old)
+    provider["gate"] = threading.Event()
+
+    # Served immediately while the refresh is still blocked in the provider
+    assert mds.fetch_price_history("AAPL") is old
+    assert mds.fetch_price_history("AAPL") is old
+    assert not provider["done"].is_set()
+
+    provider["gate"].set()
+    _wait_for_refresh()
+
+    assert provider["calls"] == ["AAPL"]
+    assert mds._PRICE_CACHE["AAPL"][1] is PRICES
+    assert mds._PRICE_CACHE["AAPL"][0] > stale_ts
+    assert mds._FETCH_LOCKS == {}
+
+
+def test_too_stale_entry_is_refetched_inline(provider: Dict[str, Any]):
+    mds._PRICE_CACHE["AAPL"] = (time.time() - mds._CACHE_STALE_SECONDS - 1, [])
+
+    assert mds.fetch_price_history("AAPL") is PRICES
+    assert provider["calls"] == ["AAPL"]
+
+
+def test_concurrent_misses_make_one_provider_call(provider: Dict[str, Any]):
+    provider["gate"] = threading.Event()
+    results: List[Any] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(mds.fetch_price_history("AAPL")))
+        for _ in range(8)
+    ]
+    for th in threads:
+        th.start()
+
+    # Hold the first fetch open so the other threads queue on the lock
+    time.sleep(0.1)
+    provider["gate"].set()
+    for th in threads:
+        th.join(5)
+
+    assert provider["calls"] == ["AAPL"]
+    assert len(results) == 8 and all(r is PRICES for r in results)
+    assert mds._FETCH_LOCKS == {}
+
+
+def test_fetch_lock_is_dropped_after_failure(provider: Dict[str, Any], monkeypatch: pytest.MonkeyPatch):
+    def failing_fetch(t: str):
+        raise ValueError("Ticker not found or insufficient price history.")
+
+    monkeypatch.setattr(mds, "_fetch_from_provider", failing_fetch)
+    with pytest.raises(ValueError):
+        mds.fetch_price_history("NOPE")
+
+    assert mds._FETCH_LOCKS == {}
@@ -0,0 +1,106 @@
+# test/test_momentum_snapshot.py
+
+"""
+Regression snapshot for logic/momentum.py
+
+The momentum math has been rewritten for speed several times (RSI series,
+curve lookup table, series-extraction fast paths, index-based prefixes).
+Every one of those rewrites must give byte-for-byte the same output as the
+original implementation, so this test replays a fixed set of seeded
+synthetic price histories and compares against the output recorded from
+the original code in test/data/momentum_snapshot.json.
+
+Only regenerate the snapshot when the scoring is meant to change:
+
+    python test/test_momentum_snapshot.py
+"""
+
+import json
+import math
+import random
+import sys
+from pathlib import Path
+
+SNAPSHOT = Path(__file__).parent / "data" / "momentum_snapshot.json"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from logic.momentum import (  # noqa: E402
+    _CURVE_CUTS,
+    _curve_score,
+    _curve_score_exact,
+    calculate_momentum_with_delta,
+)
+
+
+def _cases():
+    """Seeded price histories covering every input shape the extractor accepts."""
+    rng = random.Random(7)
+    cases = []
+    for n in (5, 9, 10, 11, 25, 40, 41, 60, 90, 120, 200, 250):
+        for trial in range(10):
+            p = 100.0
+            drift = rng.uniform(-0.004, 0.004)
+            vol = rng.uniform(0.002, 0.04)
+            kind = trial % 6
+            hist = []
+            for _ in range(n):
+                p = max(p * (1 + rng.gauss(drift, vol)), 0.5)
+                if kind == 0:
+                    hist.append(p)
+                elif kind == 1:
+                    hist.append({"close": p, "volume": rng.randint(1000, 100000)})
+                elif kind == 2:
+                    hist.append({"price": p})
+                elif kind == 3:
+                    # occasional missing closes / volumes
+                    r = rng.random()
+                    if r < 0.03:
+                        hist.append({"close": None})
+                    elif r < 0.06:
+                        hist.append({"close": p})
+                    else:
+                        hist.append({"close": p, "volume": rng.randint(1000, 100000)})
+                elif kind == 4:
+                    hist.append(int(p) if rng.random() < 0.5 else p)
+                else:
+                    # junk mixed in with valid points
+                    r = rng.random()
+                    if r < 0.05:
+                        hist.append(rng.choice(["x", None, True, [], {"open": p}]))
+                    elif r < 0.5:
+                        hist.append(str(round(p, 2)))
+                    else:
+                        hist.append(p)
+            cases.append(hist)
+    cases += [[], None, [10] * 50, [10.0, 0.0] * 20]
+    return cases
+
+
+def _run():
+    return [calculate_momentum_with_delta(h) for h in _cases()]
+
+
+def test_matches_snapshot():
+    expected = json.loads(SNAPSHOT.read_text())
+    actual = json.loads(json.dumps(_run(), sort_keys=True))
+    assert len(actual) == len(expected)
+    for i, (a, e) in enumerate(zip(actual, expected)):
+        assert a == e, f"case {i} differs"
+
+
+def test_curve_lookup_matches_formula():
+    rng = random.Random(11)
+    points = [0.0, 1.0, 0.5] + [rng.random() for _ in range(20000)]
+    # Exact step boundaries and their neighbours
+    for cut in _CURVE_CUTS:
+        points += [cut, math.nextafter(cut, 0.0), math.nextafter(cut, 1.0)]
+
+    for x in points:
+        assert _curve_score(x) == _curve_score_exact(x), x
+
+
+if __name__ == "__main__":
+    SNAPSHOT.parent.mkdir(exist_ok=True)
+    SNAPSHOT.write_text(json.dumps(_run(), sort_keys=True, indent=1) + "\n")
+    print(f"wrote {SNAPSHOT}")
@@ -0,0 +1,106 @@
+# test/test_waitlist_service.py
+
+"""
+Tests for services/waitlist_service.py
+
+The waitlist is an append-only JSONL file. Older deployments stored a
+pretty-printed JSON array instead; these tests make sure such files are
+migrated rather than appended to, and that dedup survives the migration.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import services.waitlist_service as waitlist_service
+
+
+LEGACY_ROWS = [
+    {"email": "a@example.com", "created_at": "2025-01-01T00:00:00Z"},
+    {"email": "b@example.com", "created_at": "2025-01-02T00:00:00Z"},
+]
+
+
+def _use_paths(monkeypatch: pytest.MonkeyPatch, path: Path, legacy: Path) -> None:
+    monkeypatch.setattr(waitlist_service, "WAITLIST_PATH", str(path))
+    monkeypatch.setattr(waitlist_service, "_LEGACY_PATH", str(legacy))
+    monkeypatch.setattr(waitlist_service, "_SEEN", None)
+
+
+def _read_jsonl(path: Path):
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def test_appends_and_dedups(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    path = tmp_path / "waitlist.jsonl"
+    _use_paths(monkeypatch, path, tmp_path / "waitlist.json")
+
+    waitlist_service.save_waitlist_email(" New@Example.com ")
+    waitlist_service.save_waitlist_email("new@example.com")
+
+    # Dedup must hold across a fresh load from disk too
+    monkeypatch.setattr(waitlist_service, "_SEEN", None)
+    waitlist_service.save_waitlist_email("new@example.com")
+
+    assert [r["email"] for r in _read_jsonl(path)] == ["new@example.com"]
+
+
+def test_migrates_sibling_legacy_array(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    path = tmp_path / "waitlist.jsonl"
+    legacy = tmp_path / "waitlist.json"
+    legacy.write_text(json.dumps(LEGACY_ROWS, indent=2))
+    _use_paths(monkeypatch, path, legacy)
+
+    waitlist_service.save_waitlist_email("a@example.com")
+    waitlist_service.save_waitlist_email("c@example.com")
+
+    emails = [r["email"] for r in _read_jsonl(path)]
+    assert emails == ["a@example.com", "b@example.com", "c@example.com"]
+
+
+def test_migrates_array_file_in_place(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # WAITLIST_PATH still set to the old .json array file
+    path = tmp_path / "waitlist.json"
+    path.write_text(json.dumps(LEGACY_ROWS, indent=2))
+    _use_paths(monkeypatch, path, path)
+
+    waitlist_service.save_waitlist_email("b@example.com")
+    waitlist_service.save_waitlist_email("c@example.com")
+
+    rows = _read_jsonl(path)
+    assert [r["email"] for r in rows] == ["a@example.com", "b@example.com", "c@example.com"]
+    assert rows[0]["created_at"] == "2025-01-01T00:00:00Z"
+
+
+def test_unreadable_array_file_is_not_appended_to(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    path = tmp_path / "waitlist.json"
+    path.write_text('[\n  {"email": "a@example.com",\n')
+    _use_paths(monkeypatch, path, path)
+
+    with pytest.raises(ValueError):
+        waitlist_service.save_waitlist_email("c@example.com")
+
+    assert path.read_text() == '[\n  {"email": "a@example.com",\n'
+
+
+@pytest.mark.parametrize(
+    "tail, kept",
+    [
+        ('{"email": "b@example.com", "crea', []),  # torn mid-row: cut
+        ('{"email": "b@example.com"}', ["b@example.com"]),  # only the newline lost
+    ],
+)
+def test_unterminated_last_line_is_repaired(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, tail, kept):
+    path = tmp_path / "waitlist.jsonl"
+    path.write_text('{"email": "a@example.com"}\n' + tail)
+    _use_paths(monkeypatch, path, tmp_path / "waitlist.json")
+
+    waitlist_service.save_waitlist_email("c@example.com")
+
+    # The new signup is on its own line and survives a fresh load
+    monkeypatch.setattr(waitlist_service, "_SEEN", None)
+    waitlist_service.save_waitlist_email("c@example.com")
+
+    emails = [r["email"] for r in _read_jsonl(path)]
+    assert emails == ["a@example.com"] + kept + ["c@example.com"]
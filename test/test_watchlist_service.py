@@ -0,0 +1,128 @@
+# test/test_watchlist_service.py
+
+"""
+Tests for services/watchlist_service.py
+
+The watchlist store keeps every user's list in memory, flushes to a JSON
+file on a short debounce, and merges with other workers' writes under a
+file lock. These tests drive that machinery against a tmp file and call
+_flush_now() directly instead of waiting on the timer.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import services.watchlist_service as ws
+
+
+@pytest.fixture
+def store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "watchlists.json"
+    monkeypatch.setattr(ws, "WATCHLIST_FILE", path)
+    monkeypatch.setattr(ws, "LOCK_FILE", tmp_path / "watchlists.lock")
+    monkeypatch.setattr(ws, "RESTAT_SECONDS", 0.0)
+    monkeypatch.setattr(ws, "_CACHE", {"sig": None, "data": None})
+    monkeypatch.setattr(ws, "_STATE", None)
+    monkeypatch.setattr(ws, "_MEMBERS", {})
+    monkeypatch.setattr(ws, "_pending_ops", [])
+    monkeypatch.setattr(ws, "_dirty", False)
+    monkeypatch.setattr(ws, "_flush_timer", None)
+    monkeypatch.setattr(ws, "_flush_failures", 0)
+    yield path
+    if ws._flush_timer is not None:
+        ws._flush_timer.cancel()
+
+
+def _on_disk(path: Path):
+    return json.loads(path.read_text())
+
+
+def test_failed_flush_is_retried(store: Path, monkeypatch: pytest.MonkeyPatch):
+    real_save = ws._save_all
+
+    def failing_save(data):
+        raise OSError("disk full")
+
+    ws.add_to_watchlist("u1", "aapl")
+    monkeypatch.setattr(ws, "_save_all", failing_save)
+    ws._flush_now()
+
+    # Still pending, and a retry is scheduled rather than waiting for the
+    # next mutation.
+    assert ws._dirty
+    assert ws._flush_timer is not None
+    assert not store.exists()
+
+    monkeypatch.setattr(ws, "_save_all", real_save)
+    ws._flush_now()
+
+    assert not ws._dirty
+    assert ws._flush_failures == 0
+    assert _on_disk(store) == {"u1": ["AAPL"]}
+
+
+def test_add_remove_roundtrip(store: Path):
+    ws.add_to_watchlist("u1", "aapl")
+    ws.add_to_watchlist("u1", "MSFT")
+    assert ws.add_to_watchlist("u1", " aapl ") == ["AAPL", "MSFT"]
+    assert ws.remove_from_watchlist("u1", "aapl") == ["MSFT"]
+    ws._flush_now()
+
+    assert _on_disk(store) == {"u1": ["MSFT"]}
+    assert not ws._pending_ops
+
+
+def test_free_limit(store: Path):
+    for t in ("A", "B", "C"):
+        ws.add_to_watchlist("u1", t)
+    with pytest.raises(ws.ProRequiredError):
+        ws.add_to_watchlist("u1", "D")
+
+
+def test_legacy_tickers_normalized_on_load(store: Path):
+    store.write_text(json.dumps({"u1": ["aapl", " msft"]}))
+
+    assert ws.get_watchlist("u1") == ["AAPL", "MSFT"]
+    ws._flush_now()
+    assert _on_disk(store) == {"u1": ["AAPL", "MSFT"]}
+
+
+def test_outside_write_is_picked_up_when_clean(store: Path):
+    ws.add_to_watchlist("u1", "AAPL")
+    ws._flush_now()
+
+    store.write_text(json.dumps({"u1": ["AAPL", "TSLA"], "u2": ["NVDA"]}))
+
+    assert ws.get_watchlist("u1") == ["AAPL", "TSLA"]
+    assert ws.get_watchlist("u2") == ["NVDA"]
+
+
+def test_flush_replays_pending_ops_onto_other_workers_write(store: Path):
+    store.write_text(json.dumps({"u1": ["AAPL"]}))
+    ws.get_watchlist("u1")
+
+    ws.add_to_watchlist("u1", "MSFT")
+    ws.remove_from_watchlist("u1", "AAPL")
+    # Meanwhile another worker flushes its own change
+    store.write_text(json.dumps({"u1": ["AAPL", "TSLA"], "u2": ["NVDA"]}))
+
+    ws._flush_now()
+
+    assert _on_disk(store) == {"u1": ["TSLA", "MSFT"], "u2": ["NVDA"]}
+    assert ws.get_watchlist("u1") == ["TSLA", "MSFT"]
+
+
+def test_replay_respects_limit(store: Path):
+    store.write_text(json.dumps({"u1": ["A", "B"]}))
+    ws.get_watchlist("u1")
+
+    # This worker admits the 3rd ticker...
+    ws.add_to_watchlist("u1", "C")
+    # ...and so did another worker, which flushed first.
+    store.write_text(json.dumps({"u1": ["A", "B", "D"]}))
+
+    ws._flush_now()
+
+    assert _on_disk(store) == {"u1": ["A", "B", "D"]}